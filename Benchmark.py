@@ -0,0 +1,286 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+import MockServer
+from RateLimiter import HostRateLimiter
+
+# --- Configuration ---
+BENCHMARK_COMPANIES = 100
+MEMORY_BENCHMARK_COMPANIES = 20000 # Companies held at once by --memory
+COMPANIES_PER_SITE = 3 # --memory: companies sharing each website (subsidiaries, trading names)
+SCENARIOS = ["MainScraper", "EmailScraper"]
+UNLIMITED_RATE = float("inf") # requests/s given to the scrapers' rate limiters
+
+
+# --- Helpers ---
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KB on Linux
+
+
+def pages_served(base_url):
+    with urllib.request.urlopen(f"{base_url}/__stats") as response:
+        return json.load(response)["pages_served"]
+
+
+def summarise(scenario, company_count, wall_seconds, pages, latencies):
+    return {
+        "scenario": scenario,
+        "companies": company_count,
+        "seconds": round(wall_seconds, 3),
+        "companies_per_sec": round(company_count / wall_seconds, 2) if wall_seconds else 0.0,
+        "pages": pages,
+        "pages_per_sec": round(pages / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+# --- Scenarios ---
+def bench_main_scraper(base_url, company_count, workdir, parse_workers=None):
+    """scrape_companies_house over the HTTP backend against the mock Companies House.
+       Per-company latency is the company page fetch plus its parse."""
+    import MainScraper
+
+    MainScraper.BASE_URL = base_url
+    MainScraper.SEARCH_URL_BASE = f"{base_url}/advanced-search/get-results?registeredOfficeAddress=Manchester&sicCodes=28150"
+    MainScraper.MAX_COMPANIES = company_count
+    MainScraper.rate_limiter = HostRateLimiter(UNLIMITED_RATE) # Measure the scraper, not its politeness
+    MainScraper.OUTPUT_CSV_FILE = os.path.join(workdir, "companies_house.csv")
+    if parse_workers is not None:
+        MainScraper.PARSE_WORKERS = parse_workers
+
+    fetch_seconds = {}
+    parse_seconds = []
+    original_fetch = MainScraper.HttpFetcher.fetch
+    original_observe = MainScraper.metrics.observe
+
+    def timed_fetch(self, url, *args):
+        started = time.perf_counter()
+        try:
+            return original_fetch(self, url, *args)
+        finally:
+            fetch_seconds[url] = time.perf_counter() - started
+
+    def recording_observe(stage, seconds):
+        if stage == "company_page_parse": # Recorded in output order, possibly measured in a parse process
+            parse_seconds.append(seconds)
+        original_observe(stage, seconds)
+
+    MainScraper.HttpFetcher.fetch = timed_fetch
+    MainScraper.metrics.observe = recording_observe
+
+    pages_before = pages_served(base_url)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): # MainScraper reports progress with print()
+        MainScraper.scrape_companies_house(backend="http")
+    wall_seconds = time.perf_counter() - started
+
+    with open(MainScraper.OUTPUT_CSV_FILE, newline="", encoding="utf-8") as output_file:
+        links = [row["Companies House Link"] for row in MainScraper.csv.DictReader(output_file)]
+    latencies = [fetch_seconds.get(link, 0.0) + parse for link, parse in zip(links, parse_seconds)]
+    return summarise("MainScraper", len(links), wall_seconds, pages_served(base_url) - pages_before, latencies)
+
+
+def bench_email_scraper(base_url, company_count, workdir, parse_workers=None):
+    """The EmailScraper pipeline (domain lookup + site crawl) with googlesearch stubbed out.
+       Per-company latency is the time spent in process_company."""
+    import EmailScraper
+    from DomainCache import DomainCache
+
+    logging.getLogger().setLevel(logging.WARNING)
+    EmailScraper.google_search = MockServer.fake_google_search(base_url)
+    EmailScraper.google_rate_limiter = HostRateLimiter(UNLIMITED_RATE)
+    EmailScraper.DOMAIN_DISCOVERY_STRATEGIES = ("search",) # Guessed domains would be probed on the real internet
+    EmailScraper.site_rate_limiter = HostRateLimiter(UNLIMITED_RATE)
+    EmailScraper.MAX_COMPANIES_TO_PROCESS = company_count
+    if parse_workers is not None:
+        EmailScraper.PARSE_WORKERS = parse_workers
+    EmailScraper.domain_cache = DomainCache(os.path.join(workdir, "domain_cache.sqlite3"), 0, 0)
+    EmailScraper.domain_results = EmailScraper.DomainResultMemo(0) # The mock sites all share one host, so keep crawling each of them
+
+    input_csv = os.path.join(workdir, "companies.csv")
+    output_csv = os.path.join(workdir, "companies_with_emails.csv")
+    with open(input_csv, "w", encoding="utf-8") as input_file:
+        input_file.write("Company Name\n")
+        input_file.writelines(f"{MockServer.company_name(i)}\n" for i in range(1, company_count + 1))
+
+    latencies = []
+    original_process_company = EmailScraper.process_company
+
+    def timed_process_company(*args):
+        started = time.perf_counter()
+        try:
+            return original_process_company(*args)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    EmailScraper.process_company = timed_process_company
+
+    pages_before = pages_served(base_url)
+    started = time.perf_counter()
+    EmailScraper.enrich_companies_csv(input_csv, output_csv)
+    wall_seconds = time.perf_counter() - started
+    return summarise("EmailScraper", len(latencies), wall_seconds, pages_served(base_url) - pages_before, latencies)
+
+
+def retained_bytes(build):
+    """Bytes still allocated by the object build() returns, measured with tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del kept
+    return retained
+
+
+def bench_memory(company_count, workdir):
+    """Bytes per company of the structures EmailScraper keeps per company or per site, in their old
+       and current form: a queued input row, a result, a crawl memo entry, the --resume lookup and
+       the output file. Runs in-process against synthetic rows; nothing is fetched."""
+    import pandas as pd
+    from concurrent.futures import Future
+    import EmailScraper
+    from ResultWriter import open_result_writer, import_pyarrow
+
+    indexes = range(1, company_count + 1)
+    chunk = pd.DataFrame({
+        "CompanyName": [MockServer.company_name(i) for i in indexes],
+        "CompanyNumber": [MockServer.company_number(i) for i in indexes],
+        "RegAddress.PostTown": ["MANCHESTER"] * company_count,
+        "RegAddress.PostCode": [f"M{i % 40} {i % 9}AB" for i in indexes],
+        "SICCode.SicText_1": ["28150 - Manufacture of bearings, gears, gearing and driving elements"] * company_count,
+    }, dtype=str)
+    site_count = -(-company_count // COMPANIES_PER_SITE)
+
+    def site_domain(i): # A fresh string each time, as the domain cache and the search results hand them out
+        return "".join(["mock-engineering-", str(i // COMPANIES_PER_SITE), ".co.uk"])
+
+    def site_emails(site):
+        return [f"info@mock-engineering-{site}.co.uk", f"sales@mock-engineering-{site}.co.uk"]
+
+    def memo_future(site):
+        future = Future()
+        future.set_result(site_emails(site))
+        return future
+
+    shared_emails = {site: tuple(site_emails(site)) for site in range(site_count + 1)}
+    rows = [
+        ("queued input row", "DataFrame row slice", lambda: [chunk.iloc[[i]] for i in range(company_count)],
+         "CompanyJob", lambda: [EmailScraper.CompanyJob(i, values[0], values) for i, values in enumerate(chunk.itertuples(index=False, name=None))]),
+        ("result", "(domain, joined emails) tuple", lambda: [(site_domain(i), "; ".join(site_emails(i // COMPANIES_PER_SITE))) for i in indexes],
+         "CompanyResult, interned domain", lambda: [EmailScraper.CompanyResult(sys.intern(site_domain(i)), shared_emails[i // COMPANIES_PER_SITE]) for i in indexes]),
+        ("crawl memo entry", "Future of a list", lambda: {site_domain(site * COMPANIES_PER_SITE): memo_future(site) for site in range(site_count)},
+         "tuple", lambda: {sys.intern(site_domain(site * COMPANIES_PER_SITE)): tuple(site_emails(site)) for site in range(site_count)}),
+        ("--resume lookup", "set of names", lambda: set(chunk["CompanyName"].str.strip()),
+         "NameDigestSet", lambda: EmailScraper.NameDigestSet(chunk["CompanyName"].str.strip())),
+    ]
+    results = []
+    for structure, before_name, build_before, after_name, build_after in rows:
+        results.append({"structure": structure, "before": before_name, "before_bytes_per_company": round(retained_bytes(build_before) / company_count, 1),
+                        "now": after_name, "now_bytes_per_company": round(retained_bytes(build_after) / company_count, 1)})
+    # The memo holds one entry per site and the NameDigestSet 8 bytes per name: both still scale with the run.
+
+    try:
+        import_pyarrow()
+        extensions = (".csv", ".parquet")
+    except ImportError:
+        extensions = (".csv",)
+    output_sizes = {}
+    for extension in extensions:
+        output_path = os.path.join(workdir, "output" + extension)
+        columns = list(chunk.columns) + ["company_domain", "company_email"]
+        with open_result_writer(output_path, columns) as result_writer:
+            for i, values in enumerate(chunk.itertuples(index=False, name=None), start=1):
+                result_writer.write_row(values + EmailScraper.CompanyResult(site_domain(i), shared_emails[i // COMPANIES_PER_SITE]).output_values())
+        output_sizes[extension] = os.path.getsize(output_path) / company_count
+    results.append({"structure": "output file (on disk)", "before": "CSV", "before_bytes_per_company": round(output_sizes[".csv"], 1),
+                    "now": "Parquet" if ".parquet" in output_sizes else "Parquet (pyarrow not installed)",
+                    "now_bytes_per_company": round(output_sizes.get(".parquet", 0.0), 1)})
+    return results
+
+
+SCENARIO_FUNCTIONS = {"MainScraper": bench_main_scraper, "EmailScraper": bench_email_scraper}
+
+
+def run_scenario_in_subprocess(scenario, base_url, company_count, parse_workers=None):
+    """Each scenario runs in a fresh interpreter so that its peak RSS is its own
+       (parse worker processes are not included in it)."""
+    command = [sys.executable, os.path.abspath(__file__), "--scenario", scenario, "--base-url", base_url, "--companies", str(company_count)]
+    if parse_workers is not None:
+        command += ["--parse-workers", str(parse_workers)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_report(results, columns=("scenario", "companies", "seconds", "companies_per_sec", "pages", "pages_per_sec", "p50_ms", "p99_ms", "peak_rss_mb")):
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark both scrapers against a local mock Companies House and mock company websites.")
+    parser.add_argument("--companies", type=int, help=f"Companies per scenario (default: {BENCHMARK_COMPANIES})")
+    parser.add_argument("--only", choices=SCENARIOS, help="Run a single scenario")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    parser.add_argument("--parse-workers", type=int, help="Parse processes for both scrapers (default: their PARSE_WORKERS)")
+    parser.add_argument("--memory", action="store_true",
+                        help=f"Instead, report bytes per company of EmailScraper's per-company structures (--companies defaults to {MEMORY_BENCHMARK_COMPANIES})")
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS) # Internal: run one scenario in this process
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.memory:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = bench_memory(args.companies or MEMORY_BENCHMARK_COMPANIES, workdir)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_report(results, list(results[0]))
+        sys.exit(0)
+    args.companies = args.companies or BENCHMARK_COMPANIES
+
+    if args.scenario:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir) # Keep any files the scrapers create out of the repo
+            print(json.dumps(SCENARIO_FUNCTIONS[args.scenario](args.base_url, args.companies, workdir, args.parse_workers)))
+        sys.exit(0)
+
+    mock_process, mock_base_url = MockServer.start_mock_server(company_count=args.companies)
+    try:
+        results = [run_scenario_in_subprocess(scenario, mock_base_url, args.companies, args.parse_workers)
+                   for scenario in ([args.only] if args.only else SCENARIOS)]
+    finally:
+        mock_process.terminate()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
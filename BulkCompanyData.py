@@ -0,0 +1,214 @@
+import argparse
+import csv
+import io
+import os
+import re
+import sqlite3
+import time
+import zipfile
+
+# --- Configuration ---
+# Companies House "Basic Company Data" (free, monthly): https://download.companieshouse.gov.uk/en_output.html
+# Download BasicCompanyDataAsOneFile-YYYY-MM-DD.zip and pass it (or the extracted .csv) to ingest.
+BULK_DB_FILE = 'basic_company_data.sqlite3'
+INGEST_BATCH_SIZE = 50000 # Rows inserted per executemany() call
+INGEST_PROGRESS_EVERY = 500000 # Rows between progress messages
+
+# Bulk CSV column -> companies table column. The CSV headers carry stray spaces (' CompanyNumber'), so they are stripped first.
+BULK_COLUMNS = {
+    "CompanyNumber": "company_number",
+    "CompanyName": "company_name",
+    "RegAddress.CareOf": "care_of",
+    "RegAddress.POBox": "po_box",
+    "RegAddress.AddressLine1": "address_line_1",
+    "RegAddress.AddressLine2": "address_line_2",
+    "RegAddress.PostTown": "post_town",
+    "RegAddress.County": "county",
+    "RegAddress.Country": "country",
+    "RegAddress.PostCode": "postcode",
+    "CompanyStatus": "company_status",
+    "IncorporationDate": "incorporation_date",
+    "SICCode.SicText_1": "sic_text_1",
+    "SICCode.SicText_2": "sic_text_2",
+    "SICCode.SicText_3": "sic_text_3",
+    "SICCode.SicText_4": "sic_text_4",
+}
+SIC_TEXT_COLUMNS = ("sic_text_1", "sic_text_2", "sic_text_3", "sic_text_4")
+ADDRESS_COLUMNS = ("care_of", "po_box", "address_line_1", "address_line_2", "post_town", "county", "country", "postcode")
+POSTCODE_DISTRICT_REGEX = re.compile(r"^([A-Z]{1,2}[0-9][0-9A-Z]?)") # "M1 1AA" -> "M1", "SK10 2AB" -> "SK10"
+
+_SCHEMA = [
+    "CREATE TABLE companies (" + ", ".join(
+        ["company_number TEXT PRIMARY KEY"] + [f"{column} TEXT" for column in list(BULK_COLUMNS.values())[1:]] + ["postcode_district TEXT"]
+    ) + ")",
+    # One row per (company, SIC code), carrying the location and name so that "SIC + town, by name" is a single index range
+    "CREATE TABLE company_sic (sic_code TEXT NOT NULL, post_town TEXT, postcode_district TEXT, company_name TEXT, company_number TEXT NOT NULL,"
+    " PRIMARY KEY (sic_code, post_town, company_name, company_number)) WITHOUT ROWID",
+    "CREATE TABLE ingest_info (source_file TEXT, row_count INTEGER, ingested_at REAL)",
+]
+_INDEXES = [
+    "CREATE INDEX companies_post_town ON companies (post_town, company_name)",
+    "CREATE INDEX companies_postcode_district ON companies (postcode_district, company_name)",
+    "CREATE INDEX companies_postcode ON companies (postcode)",
+    "CREATE INDEX company_sic_postcode_district ON company_sic (sic_code, postcode_district, company_name)",
+    "CREATE INDEX company_sic_name ON company_sic (sic_code, company_name)",
+]
+
+
+# --- Ingestion ---
+def open_bulk_csv(source_path):
+    """Opens the bulk CSV for reading, straight out of the downloaded .zip if that is what source_path is."""
+    if zipfile.is_zipfile(source_path):
+        archive = zipfile.ZipFile(source_path)
+        csv_name = next(name for name in archive.namelist() if name.lower().endswith('.csv'))
+        return io.TextIOWrapper(archive.open(csv_name), encoding='utf-8-sig', errors='replace', newline='')
+    return open(source_path, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def postcode_district(postcode):
+    match = POSTCODE_DISTRICT_REGEX.match((postcode or "").strip().upper())
+    return match.group(1) if match else ""
+
+
+def sic_code(sic_text):
+    """'28150 - Manufacture of bearings, ...' -> '28150'; 'None Supplied' -> ''."""
+    code = (sic_text or "").split(" - ", 1)[0].strip()
+    return code if code.isdigit() else ""
+
+
+def ingest_basic_company_data(source_path, db_path=BULK_DB_FILE):
+    """Loads the Basic Company Data CSV (or its .zip) into an SQLite file indexed by company number,
+       SIC code, post town and postcode. The database is built next to db_path and swapped in at the end,
+       so a failed ingest leaves the previous copy untouched. Returns the number of companies loaded."""
+    building_path = db_path + '.building'
+    if os.path.exists(building_path):
+        os.remove(building_path)
+    connection = sqlite3.connect(building_path)
+    connection.execute("PRAGMA journal_mode = OFF") # A half-built file is thrown away, so skip crash safety
+    connection.execute("PRAGMA synchronous = OFF")
+    for statement in _SCHEMA:
+        connection.execute(statement)
+
+    table_columns = list(BULK_COLUMNS.values()) + ["postcode_district"]
+    insert_company = f"INSERT OR REPLACE INTO companies ({', '.join(table_columns)}) VALUES ({', '.join('?' * len(table_columns))})"
+    insert_sic = "INSERT OR IGNORE INTO company_sic (sic_code, post_town, postcode_district, company_name, company_number) VALUES (?, ?, ?, ?, ?)"
+
+    row_count = 0
+    started = time.perf_counter()
+    with open_bulk_csv(source_path) as bulk_file:
+        reader = csv.reader(bulk_file)
+        header = [column.strip() for column in next(reader)]
+        missing = [column for column in BULK_COLUMNS if column not in header]
+        if missing:
+            raise ValueError(f"{source_path} does not look like Basic Company Data; missing columns: {missing}")
+        positions = [header.index(column) for column in BULK_COLUMNS]
+        sic_positions = positions[-len(SIC_TEXT_COLUMNS):]
+        postcode_position = header.index("RegAddress.PostCode")
+        town_index = list(BULK_COLUMNS).index("RegAddress.PostTown")
+
+        company_batch, sic_batch = [], []
+        for row in reader:
+            if len(row) < len(header):
+                continue # Truncated line
+            values = [row[position].strip() for position in positions]
+            values[town_index] = values[town_index].upper() # Queried case-insensitively through its index
+            district = postcode_district(row[postcode_position])
+            values.append(district)
+            company_batch.append(values)
+            for position in sic_positions:
+                code = sic_code(row[position])
+                if code:
+                    sic_batch.append((code, values[town_index], district, values[1], values[0]))
+            row_count += 1
+            if len(company_batch) >= INGEST_BATCH_SIZE:
+                connection.executemany(insert_company, company_batch)
+                connection.executemany(insert_sic, sic_batch)
+                company_batch, sic_batch = [], []
+            if row_count % INGEST_PROGRESS_EVERY == 0:
+                print(f"  {row_count} companies loaded ({time.perf_counter() - started:.0f}s)")
+        connection.executemany(insert_company, company_batch)
+        connection.executemany(insert_sic, sic_batch)
+
+    print("Building indexes...")
+    for statement in _INDEXES:
+        connection.execute(statement)
+    connection.execute("ANALYZE") # Lets the planner pick the SIC side or the location side, whichever is smaller
+    connection.execute("INSERT INTO ingest_info VALUES (?, ?, ?)", (os.path.basename(source_path), row_count, time.time()))
+    connection.commit()
+    connection.close()
+    os.replace(building_path, db_path)
+    print(f"Loaded {row_count} companies into {db_path} in {time.perf_counter() - started:.1f}s.")
+    return row_count
+
+
+# --- Queries ---
+def location_column(location):
+    """'M1' / 'SK10' are matched against the postcode district, anything else against the post town."""
+    location = location.strip().upper()
+    return "postcode_district" if POSTCODE_DISTRICT_REGEX.fullmatch(location) else "post_town"
+
+
+def search_companies(db_path=BULK_DB_FILE, sic_codes=(), location=None, limit=None):
+    """Companies with any of sic_codes whose post town or postcode district is `location`
+       ('Manchester', 'M1', 'SK10'), ordered by name. Both filters are optional. Returns sqlite3.Row objects.
+       A single SIC code plus a location is answered straight from the company_sic primary key, in name order."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path} not found. Build it first with: python BulkCompanyData.py ingest <BasicCompanyData file>")
+    clauses, parameters = [], []
+    if sic_codes:
+        source = "company_sic AS s JOIN companies AS c ON c.company_number = s.company_number"
+        filtered = "s"
+        clauses.append(f"s.sic_code IN ({', '.join('?' * len(sic_codes))})")
+        parameters += [str(code) for code in sic_codes]
+    else:
+        source = "companies AS c"
+        filtered = "c"
+    if location:
+        clauses.append(f"{filtered}.{location_column(location)} = ?")
+        parameters.append(location.strip().upper())
+    query = f"SELECT DISTINCT c.* FROM {source}"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += f" ORDER BY {filtered}.company_name, c.company_number"
+    if limit:
+        query += " LIMIT ?"
+        parameters.append(int(limit))
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        return connection.execute(query, parameters).fetchall()
+    finally:
+        connection.close()
+
+
+def format_address(company):
+    """The registered office address as one line, in the same order as the company page shows it."""
+    return ", ".join(company[column] for column in ADDRESS_COLUMNS if company[column]) or "Not found"
+
+
+def format_sic_description(company):
+    """The SIC descriptions joined the way MainScraper.parse_company_page joins them."""
+    sic_texts = [company[column] for column in SIC_TEXT_COLUMNS if sic_code(company[column])]
+    return " | ".join(dict.fromkeys(sic_texts)) if sic_texts else "Not found"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the Companies House Basic Company Data file into an indexed SQLite database and query it.")
+    parser.add_argument("--db", default=BULK_DB_FILE, help=f"SQLite database (default: {BULK_DB_FILE})")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subcommands.add_parser("ingest", help="Build the database from BasicCompanyDataAsOneFile-*.zip (or the .csv inside it)")
+    ingest_parser.add_argument("source", help="Path to the downloaded .zip or extracted .csv")
+    query_parser = subcommands.add_parser("query", help="Count and list the companies matching a SIC code / location")
+    query_parser.add_argument("--sic", action="append", default=[], help="SIC code, e.g. 28150 (repeatable)")
+    query_parser.add_argument("--location", help="Post town or postcode district, e.g. Manchester or M1")
+    query_parser.add_argument("--limit", type=int, default=20, help="Companies to list (default: 20)")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        ingest_basic_company_data(args.source, args.db)
+    else:
+        started = time.perf_counter()
+        matches = search_companies(args.db, args.sic, args.location)
+        print(f"{len(matches)} companies found in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for company in matches[:args.limit]:
+            print(f"  {company['company_number']}  {company['company_name']}  ({format_address(company)})")
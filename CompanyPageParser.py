@@ -0,0 +1,531 @@
+import re
+import time
+import logging
+from collections import namedtuple
+from bs4 import BeautifulSoup, NavigableString, CData, Tag
+
+try:
+    import lxml.html
+except ImportError: # lxml is optional; the htmlparser backend needs nothing extra
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxHTMLParser
+except ImportError: # selectolax is optional too
+    SelectolaxHTMLParser = None
+
+# --- Configuration ---
+# "htmlparser" (BeautifulSoup's html.parser, the original behaviour), "lxml" or "selectolax" (its lexbor parser).
+# The last two are about 10x faster and need their package installed.
+COMPANY_PAGE_PARSER_BACKEND = "lxml" if lxml is not None else "htmlparser"
+
+REGISTERED_OFFICE_LABEL_REGEX = re.compile(r"Registered office address", re.IGNORECASE)
+SIC_SECTION_LABEL_REGEX = re.compile(r"Nature of business \(SIC\)", re.IGNORECASE)
+SIC_ENTRY_REGEX = re.compile(r"^\d{5}\s*-") # "28150 - Manufacture of ..."
+NO_RESULTS_HEADING_REGEX = re.compile(r"\s*0\s+companies found", re.IGNORECASE)
+SIC_LABEL_TAGS = ('h2', 'h3', 'dt')
+SIC_LIST_SIBLINGS_CHECKED = 3 # Sibling elements after the SIC label searched for its <ul>
+HIDDEN_TEXT_CLASS = 'govuk-visually-hidden' # "(link opens a new window)" spans inside result links
+
+CompanyDetails = namedtuple('CompanyDetails', ['location', 'sic_description', 'sic_found_method'])
+SearchResult = namedtuple('SearchResult', ['company_name', 'href'])
+SearchPage = namedtuple('SearchPage', ['results', 'no_companies_found']) # no_companies_found: the "0 companies found" heading is present
+
+
+# --- Document adapters ---
+# The extraction rules below are written once against this small interface. Each backend exposes its
+# parse tree through it: elements in document order, sibling/parent navigation, attributes, child nodes
+# (elements and text, as str) and the text nodes BeautifulSoup's get_text() would see (no comments).
+
+class _SoupTree:
+    @staticmethod
+    def parse(markup):
+        return BeautifulSoup(markup, 'html.parser')
+
+    @staticmethod
+    def elements(node):
+        return node.find_all(True)
+
+    @staticmethod
+    def tag(element):
+        return element.name
+
+    @staticmethod
+    def get(element, attribute):
+        value = element.get(attribute)
+        return " ".join(value) if isinstance(value, list) else value
+
+    @staticmethod
+    def parent(element):
+        parent = element.parent
+        return parent if isinstance(parent, Tag) and parent.name != '[document]' else None
+
+    @staticmethod
+    def next_element_sibling(element):
+        return element.find_next_sibling()
+
+    @staticmethod
+    def element_children(element):
+        return element.find_all(True, recursive=False)
+
+    @staticmethod
+    def nodes(element):
+        for child in element.children:
+            if isinstance(child, Tag):
+                yield child
+            elif type(child) in (NavigableString, CData):
+                yield str(child)
+
+    @staticmethod
+    def strings(element):
+        for descendant in element.descendants:
+            if type(descendant) in (NavigableString, CData):
+                yield str(descendant)
+
+    @staticmethod
+    def only_string(element):
+        string = element.string
+        return str(string) if string is not None else None
+
+
+class _LxmlTree:
+    @staticmethod
+    def parse(markup):
+        try:
+            return lxml.html.document_fromstring(markup)
+        except (lxml.etree.ParserError, ValueError): # "Document is empty": blank or comment-only page
+            return lxml.html.document_fromstring("<html></html>")
+
+    @staticmethod
+    def elements(node):
+        return (element for element in node.iterdescendants() if isinstance(element.tag, str))
+
+    @staticmethod
+    def tag(element):
+        return element.tag
+
+    @staticmethod
+    def get(element, attribute):
+        return element.get(attribute)
+
+    @staticmethod
+    def parent(element):
+        return element.getparent()
+
+    @staticmethod
+    def next_element_sibling(element):
+        sibling = element.getnext()
+        while sibling is not None and not isinstance(sibling.tag, str):
+            sibling = sibling.getnext()
+        return sibling
+
+    @staticmethod
+    def element_children(element):
+        return [child for child in element if isinstance(child.tag, str)]
+
+    @staticmethod
+    def nodes(element):
+        if element.text:
+            yield element.text
+        for child in element:
+            if isinstance(child.tag, str):
+                yield child
+            if child.tail:
+                yield child.tail
+
+    @staticmethod
+    def strings(element):
+        if element.text:
+            yield element.text
+        for child in element:
+            if isinstance(child.tag, str):
+                yield from _LxmlTree.strings(child)
+            if child.tail:
+                yield child.tail
+
+    @staticmethod
+    def only_string(element):
+        while True:
+            children = list(element)
+            if not children:
+                return element.text
+            if len(children) > 1 or element.text or children[0].tail or not isinstance(children[0].tag, str):
+                return None
+            element = children[0]
+
+
+class _SelectolaxTree:
+    @staticmethod
+    def parse(markup):
+        return SelectolaxHTMLParser(markup).root
+
+    @staticmethod
+    def elements(node):
+        return (element for element in node.traverse(include_text=False) if element is not node and not element.tag.startswith(('-', '_', '!')))
+
+    @staticmethod
+    def tag(element):
+        return element.tag
+
+    @staticmethod
+    def get(element, attribute):
+        return element.attributes.get(attribute)
+
+    @staticmethod
+    def parent(element):
+        parent = element.parent
+        return parent if parent is not None and not parent.tag.startswith('-') else None # '-document' is not an element
+
+    @staticmethod
+    def _children(element):
+        child = element.child
+        while child is not None:
+            yield child
+            child = child.next
+
+    @staticmethod
+    def next_element_sibling(element):
+        sibling = element.next
+        while sibling is not None and sibling.tag.startswith(('-', '_', '!')):
+            sibling = sibling.next
+        return sibling
+
+    @staticmethod
+    def element_children(element):
+        return [child for child in _SelectolaxTree._children(element) if not child.tag.startswith(('-', '_', '!'))]
+
+    @staticmethod
+    def nodes(element):
+        for child in _SelectolaxTree._children(element):
+            if child.tag == '-text':
+                yield child.text(deep=False)
+            elif not child.tag.startswith(('-', '_', '!')):
+                yield child
+
+    @staticmethod
+    def strings(element):
+        for child in _SelectolaxTree._children(element):
+            if child.tag == '-text':
+                yield child.text(deep=False)
+            elif not child.tag.startswith(('-', '_', '!')):
+                yield from _SelectolaxTree.strings(child)
+
+    @staticmethod
+    def only_string(element):
+        while True:
+            children = list(_SelectolaxTree._children(element))
+            if len(children) != 1:
+                return None
+            if children[0].tag == '-text':
+                return children[0].text(deep=False)
+            element = children[0]
+
+
+_TREES = {"htmlparser": _SoupTree, "lxml": _LxmlTree, "selectolax": _SelectolaxTree}
+
+
+def _tree_for(backend):
+    backend = backend or COMPANY_PAGE_PARSER_BACKEND
+    if backend == "lxml" and lxml is None:
+        raise ImportError("The lxml parser backend needs the lxml package (pip install lxml).")
+    if backend == "selectolax" and SelectolaxHTMLParser is None:
+        raise ImportError("The selectolax parser backend needs the selectolax package (pip install selectolax).")
+    if backend not in _TREES:
+        raise ValueError(f"Unknown parser backend: {backend!r} (expected one of {sorted(_TREES)})")
+    return _TREES[backend]
+
+
+# --- Shared extraction rules ---
+def _has_class(tree, element, class_name):
+    return class_name in (tree.get(element, 'class') or "").split()
+
+def _stripped_text(tree, element, skip=None):
+    """get_text(strip=True): every text node stripped and concatenated. Subtrees for which skip(element) is true are left out."""
+    if skip is None:
+        return "".join(string.strip() for string in tree.strings(element))
+    parts = []
+    for node in tree.nodes(element):
+        if isinstance(node, str):
+            parts.append(node.strip())
+        elif not skip(node):
+            parts.append(_stripped_text(tree, node, skip))
+    return "".join(parts)
+
+def _find_labelled(tree, elements, tag_names, label_regex):
+    for element in elements:
+        if tree.tag(element) in tag_names:
+            string = tree.only_string(element)
+            if string is not None and label_regex.search(string):
+                return element
+    return None
+
+def _first_descendant(tree, element, tag_name):
+    return next((descendant for descendant in tree.elements(element) if tree.tag(descendant) == tag_name), None)
+
+def _has_ancestor(tree, element, tag_name):
+    ancestor = tree.parent(element)
+    while ancestor is not None:
+        if tree.tag(ancestor) == tag_name:
+            return True
+        ancestor = tree.parent(ancestor)
+    return False
+
+def _sic_list(tree, label):
+    """The <ul> holding the SIC entries: the first of the next few siblings that is (or, for dd/div, wraps) a list,
+       else the first list anywhere under the label's parent."""
+    current_element = label
+    for _ in range(SIC_LIST_SIBLINGS_CHECKED):
+        sibling = tree.next_element_sibling(current_element)
+        if sibling is None:
+            break
+        sibling_tag = tree.tag(sibling)
+        if sibling_tag == 'ul':
+            return sibling
+        if sibling_tag in ('dd', 'div'):
+            nested_list = _first_descendant(tree, sibling, 'ul')
+            if nested_list is not None:
+                return nested_list
+        current_element = sibling
+    parent = tree.parent(label)
+    return _first_descendant(tree, parent, 'ul') if parent is not None else None
+
+
+def parse_company_page(markup, backend=None):
+    """Extracts CompanyDetails(location, sic_description, sic_found_method) from a company overview page."""
+    tree = _tree_for(backend)
+    document = tree.parse(markup)
+    elements = list(tree.elements(document))
+
+    location = "Not found"
+    location_label = _find_labelled(tree, elements, ('dt',), REGISTERED_OFFICE_LABEL_REGEX)
+    if location_label is not None:
+        location_value = tree.next_element_sibling(location_label)
+        while location_value is not None and tree.tag(location_value) != 'dd':
+            location_value = tree.next_element_sibling(location_value)
+        if location_value is not None:
+            location_parts = [part.strip() for string in tree.strings(location_value) for part in string.split('\n') if part.strip()]
+            location = ", ".join(location_parts)
+
+    sic_description_parts = []
+    sic_found_method = "None"
+    sic_label = _find_labelled(tree, elements, SIC_LABEL_TAGS, SIC_SECTION_LABEL_REGEX)
+    sic_list = _sic_list(tree, sic_label) if sic_label is not None else None
+    if sic_list is not None:
+        sic_spans = [element for element in tree.elements(sic_list)
+                     if tree.tag(element) == 'span' and (tree.get(element, 'id') or "").startswith('sic') and _has_ancestor(tree, element, 'li')]
+        if sic_spans:
+            sic_description_parts = [text for text in (_stripped_text(tree, span) for span in sic_spans) if text and SIC_ENTRY_REGEX.match(text)]
+            if sic_description_parts:
+                sic_found_method = "Label->UL/DD->LI->SPAN[id^=sic]"
+        else:
+            list_items = [child for child in tree.element_children(sic_list) if tree.tag(child) == 'li']
+            sic_description_parts = [text for text in (_stripped_text(tree, item) for item in list_items) if text and SIC_ENTRY_REGEX.match(text)]
+            if sic_description_parts:
+                sic_found_method = "Label->UL/DD->LI Text"
+    unique_sics = list(dict.fromkeys(part.strip() for part in sic_description_parts if part.strip()))
+    sic_description = " | ".join(unique_sics) if unique_sics else "Not found"
+    return CompanyDetails(location, sic_description, sic_found_method)
+
+
+def _result_link(tree, container):
+    """The `h2.govuk-heading-m > a.govuk-link[href^="/company/"]` inside container, or None."""
+    for element in tree.elements(container):
+        if tree.tag(element) == 'a' and _has_class(tree, element, 'govuk-link') and (tree.get(element, 'href') or "").startswith('/company/'):
+            heading = tree.parent(element)
+            if heading is not None and tree.tag(heading) == 'h2' and _has_class(tree, heading, 'govuk-heading-m'):
+                return element
+    return None
+
+
+def parse_search_page(markup, backend=None):
+    """Extracts SearchPage(results=[SearchResult(company_name, href)], no_companies_found) from an
+       advanced search results page. Handles both the govuk-table and the ul#results-list layouts."""
+    tree = _tree_for(backend)
+    document = tree.parse(markup)
+    elements = list(tree.elements(document))
+
+    result_links = []
+    results_table = next((element for element in elements if tree.tag(element) == 'table' and _has_class(tree, element, 'govuk-table')), None)
+    if results_table is not None and _first_descendant(tree, results_table, 'tbody') is not None:
+        for cell in tree.elements(results_table):
+            if tree.tag(cell) != 'td' or not _has_class(tree, cell, 'govuk-table__cell'):
+                continue
+            row = tree.parent(cell)
+            body = tree.parent(row) if row is not None and tree.tag(row) == 'tr' else None
+            if body is None or tree.tag(body) != 'tbody':
+                continue
+            link = _result_link(tree, cell)
+            if link is not None:
+                result_links.append(link)
+    else:
+        results_list = next((element for element in elements if tree.tag(element) == 'ul' and tree.get(element, 'id') == 'results-list'), None)
+        for item in tree.element_children(results_list) if results_list is not None else []:
+            if tree.tag(item) == 'li':
+                link = _result_link(tree, item)
+                if link is not None:
+                    result_links.append(link)
+
+    is_hidden = lambda element: tree.tag(element) == 'span' and _has_class(tree, element, HIDDEN_TEXT_CLASS)
+    results = [SearchResult(_stripped_text(tree, link, skip=is_hidden), tree.get(link, 'href')) for link in result_links]
+    no_companies_found = _find_labelled(tree, elements, ('h1',), NO_RESULTS_HEADING_REGEX) is not None
+    return SearchPage(results, no_companies_found)
+
+
+# --- Self-check fixtures ---
+# Company and search pages in the layouts Companies House has used, plus awkward variants. The
+# self-check compares every backend with the original BeautifulSoup code (kept below) on all of them.
+COMPANY_PAGE_FIXTURES = [
+    # Current layout: h2 label, ul of spans with sic ids
+    """<html><body><dl><dt>Registered office address</dt><dd class="text data" id="company-address">
+      Unit 5, Mill Lane
+      Manchester
+      M1 1AA
+    </dd></dl><h2 class="heading-medium" id="sic-title">Nature of business (SIC)</h2>
+    <ul><li><span id="sic0">28150 - Manufacture of bearings, gears, gearing and driving elements</span></li>
+    <li><span id="sic1">25620 - Machining</span></li></ul></body></html>""",
+    # dt/dd layout with a nested list and plain li text
+    """<html><body><dl><dt>Registered office address</dt><dd>1 High St<br>Leeds<br>LS1 2BB</dd>
+    <dt>Nature of business (SIC)</dt><dd><ul><li>33120 - Repair of machinery</li><li>Not a SIC</li></ul></dd></dl></body></html>""",
+    # The list is wrapped in a div two siblings after the label
+    """<html><body><h3>Nature of business (SIC)</h3><p>Updated 2020</p><div class="list"><ul><li>28150 - Bearings &amp; gears</li>
+    <li>28150 - Bearings &amp; gears</li></ul></div></body></html>""",
+    # No list among the siblings: falls back to the first list under the label's parent
+    """<html><body><section><ul><li>62020 - IT consultancy</li></ul><h2>Nature of business (SIC)</h2><p>a</p><p>b</p><p>c</p><p>d</p></section></body></html>""",
+    # Spans nested deeper inside the li, a non-SIC span and a comment
+    """<html><body><h2>Nature of business (SIC)</h2><ul><li><div><span id="sic9"> 28150 - <b>Gears</b> </span></div></li>
+    <li><span id="sicx">None Supplied</span><!-- 99999 - hidden --></li></ul></body></html>""",
+    # Label text wrapped in an element, whitespace in labels, and a registered office with no dd
+    """<html><body><dl><dt><span>Registered office address</span></dt></dl><h2>
+      Nature of business (SIC)
+    </h2><ul><li>  82990 - Other business support  </li></ul></body></html>""",
+    # Nothing to find
+    """<html><body><h1>Page not found</h1></body></html>""",
+    # Dissolved company: "None Supplied" and entities in the address
+    """<html><body><dl><dt>Registered office address</dt><dd>C/O Smith &amp; Co, 2 Quay St, Manchester, M3 3HN</dd></dl>
+    <h2>Nature of business (SIC)</h2><ul><li><span id="sic0">None Supplied</span></li></ul></body></html>""",
+    # Empty, blank and comment-only responses (lxml refuses to parse these)
+    "", " \n\t ", "<!-- maintenance -->",
+]
+
+SEARCH_PAGE_FIXTURES = [
+    # Table layout, hidden "(link opens a new window)" spans, a row without a company link
+    """<html><body><h1>2 companies found</h1><table class="govuk-table"><tbody class="govuk-table__body">
+    <tr class="govuk-table__row"><td class="govuk-table__cell"><h2 class="govuk-heading-m"><a class="govuk-link" href="/company/01234567" target="_blank">
+      ACME &amp; SONS LIMITED <span class="govuk-visually-hidden">(link opens a new window)</span></a></h2><p>01234567 - Incorporated on 1 January 2001</p></td></tr>
+    <tr class="govuk-table__row"><td class="govuk-table__cell"><p>Advert</p></td></tr>
+    <tr class="govuk-table__row"><td class="govuk-table__cell"><h2 class="govuk-heading-m"><a class="govuk-link extra" href="/company/SC123456">BETA <b>GEARS</b> LTD</a></h2></td></tr>
+    </tbody></table></body></html>""",
+    # List layout
+    """<html><body><h1>1 companies found</h1><ul id="results-list"><li><h2 class="govuk-heading-m"><a class="govuk-link" href="/company/07654321">
+    GAMMA ENGINEERING LIMITED<span class="govuk-visually-hidden">(link opens a new window)</span></a></h2></li><li><p>No link here</p></li></ul></body></html>""",
+    # A table that is not the results table falls back to the list, links outside h2.govuk-heading-m are ignored
+    """<html><body><table class="layout"><tbody><tr><td class="govuk-table__cell"><h2 class="govuk-heading-m"><a class="govuk-link" href="/company/1">X</a></h2></td></tr></tbody></table>
+    <ul id="results-list"><li><h3 class="govuk-heading-m"><a class="govuk-link" href="/company/2">Y</a></h3></li>
+    <li><h2 class="govuk-heading-m"><a class="govuk-link" href="/company/3">Z</a></h2></li></ul></body></html>""",
+    # No results
+    """<html><body><h1> 0 companies found</h1></body></html>""",
+    """<html><body><p>No results</p></body></html>""",
+    "", " \n\t ", "<!-- maintenance -->",
+]
+
+
+def _legacy_parse_company_page(company_page_content):
+    """MainScraper.parse_company_page as it was before this module, for the self-check."""
+    company_soup = BeautifulSoup(company_page_content, 'html.parser')
+    location = "Not found"
+    location_dt = company_soup.find('dt', string=re.compile(r"Registered office address", re.IGNORECASE))
+    if location_dt:
+        location_dd = location_dt.find_next_sibling('dd')
+        if location_dd:
+            location_parts = [part.strip() for part in location_dd.get_text(separator='\n').split('\n') if part.strip()]
+            location = ", ".join(location_parts)
+    sic_description_parts = []
+    sic_found_method = "None"
+    sic_section_label = company_soup.find(['h2', 'h3', 'dt'], string=re.compile(r"Nature of business \(SIC\)", re.IGNORECASE))
+    if sic_section_label:
+        ul_element = None; current_element = sic_section_label
+        for _ in range(3):
+            next_sibling = current_element.find_next_sibling()
+            if not next_sibling: break
+            if next_sibling.name == 'ul': ul_element = next_sibling; break
+            if next_sibling.name == 'dd' and next_sibling.find('ul'): ul_element = next_sibling.find('ul'); break
+            if next_sibling.name == 'div' and next_sibling.find('ul'): ul_element = next_sibling.find('ul'); break
+            current_element = next_sibling
+        if not ul_element and sic_section_label.parent: ul_element = sic_section_label.parent.find('ul')
+        if ul_element:
+            span_tags_in_ul = ul_element.select('li > span[id^="sic"], li span[id^="sic"]')
+            if span_tags_in_ul:
+                for span_tag in span_tags_in_ul:
+                    text = span_tag.get_text(strip=True)
+                    if text and re.match(r"^\d{5}\s*-", text): sic_description_parts.append(text)
+                if sic_description_parts: sic_found_method = "Label->UL/DD->LI->SPAN[id^=sic]"
+            else:
+                list_items = ul_element.find_all('li', recursive=False)
+                for li_item in list_items:
+                    text = li_item.get_text(strip=True)
+                    if text and re.match(r"^\d{5}\s*-", text): sic_description_parts.append(text)
+                if sic_description_parts: sic_found_method = "Label->UL/DD->LI Text"
+    unique_sics = list(dict.fromkeys([s.strip() for s in sic_description_parts if s.strip()])) if sic_description_parts else []
+    sic_description = " | ".join(unique_sics) if unique_sics else "Not found"
+    return CompanyDetails(location, sic_description, sic_found_method)
+
+
+def _legacy_parse_search_page(page_content):
+    """The search-result extraction from MainScraper.collect_company_links before this module, for the self-check."""
+    soup = BeautifulSoup(page_content, 'html.parser')
+    search_result_items = []
+    search_results_table = soup.find('table', class_='govuk-table')
+    if search_results_table and search_results_table.find('tbody'):
+        for cell in search_results_table.select('tbody > tr > td.govuk-table__cell'):
+            if cell.select_one('h2.govuk-heading-m > a.govuk-link[href^="/company/"]'):
+                search_result_items.append(cell)
+    else:
+        search_result_items = soup.select('ul#results-list > li')
+    results = []
+    for item_container in search_result_items:
+        link_element = item_container.select_one('h2.govuk-heading-m > a.govuk-link[href^="/company/"]')
+        if not link_element:
+            continue
+        actual_link_tag = BeautifulSoup(str(link_element), 'html.parser').find('a')
+        for hidden_span in actual_link_tag.select('span.govuk-visually-hidden'):
+            hidden_span.decompose()
+        results.append(SearchResult(actual_link_tag.get_text(strip=True), link_element.get('href')))
+    no_results_h1 = soup.find('h1', string=re.compile(r"\s*0\s+companies found", re.IGNORECASE))
+    return SearchPage(results, no_results_h1 is not None)
+
+
+if __name__ == "__main__":
+    import sys
+    import MockServer
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    backends = ["htmlparser"] + (["lxml"] if lxml is not None else []) + (["selectolax"] if SelectolaxHTMLParser is not None else [])
+    company_pages = COMPANY_PAGE_FIXTURES + [MockServer.render_company_page(index) for index in range(1, 7)]
+    search_pages = SEARCH_PAGE_FIXTURES + [MockServer.render_search_page(page, 45) for page in range(1, 5)]
+
+    failures = 0
+    for parse, legacy_parse, pages in ((parse_company_page, _legacy_parse_company_page, company_pages),
+                                       (parse_search_page, _legacy_parse_search_page, search_pages)):
+        for page in pages:
+            expected = legacy_parse(page)
+            for backend in backends:
+                result = parse(page, backend)
+                if result != expected:
+                    failures += 1
+                    logging.error(f"{backend} {parse.__name__} returned {result}, expected {expected} for {page[:80]!r}...")
+    logging.info(f"Fixtures: {len(company_pages)} company pages, {len(search_pages)} search pages, "
+                 f"backends {backends}, {failures} mismatch(es).")
+    if failures:
+        raise SystemExit(1) # The same checks run under pytest: python -m pytest test_CompanyPageParser.py
+    if "--benchmark" not in sys.argv[1:]:
+        raise SystemExit(0)
+
+    # Microbenchmark (--benchmark): pages parsed per second on the mock Companies House pages
+    rounds = 200
+    for name, parse, legacy_parse, page in (("company page", parse_company_page, _legacy_parse_company_page, MockServer.render_company_page(1)),
+                                            ("search page", parse_search_page, _legacy_parse_search_page, MockServer.render_search_page(1, 45))):
+        for label, function in [("legacy", legacy_parse)] + [(b, lambda p, b=b: parse(p, b)) for b in backends]:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                function(page)
+            logging.info(f"{name:>12} {label:>10}: {rounds / (time.perf_counter() - started):8.1f} pages/sec")
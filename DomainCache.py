@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+import time
+import re
+
+# Company name suffixes that don't change which website a company resolves to.
+_NAME_SUFFIXES = {
+    "limited": "ltd",
+    "ltd": "ltd",
+    "plc": "plc",
+    "llp": "llp",
+    "incorporated": "inc",
+    "inc": "inc",
+    "company": "co",
+    "co": "co",
+}
+
+
+def normalize_company_name(company_name):
+    """Lower-cases a company name, drops punctuation and collapses whitespace so that
+       'ACME Widgets Limited' and 'Acme Widgets Ltd.' share a cache entry."""
+    name = company_name.lower().replace("&", " and ")
+    words = re.sub(r"[^a-z0-9]+", " ", name).split()
+    if words and words[-1] in _NAME_SUFFIXES:
+        words[-1] = _NAME_SUFFIXES[words[-1]]
+    return " ".join(words)
+
+
+class DomainCache:
+    """Persistent SQLite cache of company name -> (domain, url) lookups.
+
+    Negative results (no suitable website found) are stored with a NULL domain and
+    expire after their own, usually shorter, TTL. Safe to share between worker threads."""
+
+    def __init__(self, path, ttl_seconds, negative_ttl_seconds):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS domain_lookups ("
+                " company_key TEXT PRIMARY KEY,"
+                " domain TEXT,"
+                " url TEXT,"
+                " looked_up_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, company_name):
+        """Returns (hit, domain, url). On a miss or an expired entry hit is False."""
+        key = normalize_company_name(company_name)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT domain, url, looked_up_at FROM domain_lookups WHERE company_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return False, None, None
+        domain, url, looked_up_at = row
+        ttl = self.ttl_seconds if domain else self.negative_ttl_seconds
+        if time.time() - looked_up_at > ttl:
+            return False, None, None
+        return True, domain, url
+
+    def put(self, company_name, domain, url):
+        """Stores a lookup result. Pass domain=None, url=None to record a negative result."""
+        key = normalize_company_name(company_name)
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO domain_lookups (company_key, domain, url, looked_up_at) VALUES (?, ?, ?, ?)",
+                (key, domain, url, time.time()),
+            )
+            connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,150 @@
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from DomainCache import normalize_company_name
+
+# Sites that list or describe companies rather than belong to them. A domain is blocked if it, or any
+# domain it is a subdomain of, is in this set (so "uk.linkedin.com" and every "*.gov.uk" are blocked).
+AGGREGATOR_DOMAINS = frozenset({
+    # Registries and official records
+    "gov.uk", "thegazette.co.uk", "opencorporates.com", "northdata.com", "northdata.de",
+    # Company information / credit check sites
+    "endole.co.uk", "companycheck.co.uk", "companieslist.co.uk", "companiesintheuk.co.uk", "company-information.co.uk",
+    "bizdb.co.uk", "duedil.com", "pomanda.com", "creditsafe.com", "dnb.com", "zoominfo.com", "crunchbase.com",
+    "bloomberg.com", "ukdata.com", "checkcompany.co.uk", "find-and-check.co.uk", "companydirectorcheck.com",
+    "globaldatabase.com", "kompass.com", "europages.co.uk", "manta.com", "rocketreach.co", "apollo.io",
+    # Directories and review sites
+    "yell.com", "thomsonlocal.com", "scoot.co.uk", "freeindex.co.uk", "cylex-uk.co.uk", "hotfrog.co.uk",
+    "192.com", "checkatrade.com", "trustpilot.com", "yelp.co.uk", "yelp.com", "applegate.co.uk", "bark.com",
+    "mybuilder.com", "ratedpeople.com", "trustatrader.com", "glassdoor.co.uk", "glassdoor.com",
+    "indeed.co.uk", "indeed.com", "reed.co.uk", "totaljobs.com",
+    # Social networks, encyclopaedias, marketplaces and search engines
+    "linkedin.com", "facebook.com", "twitter.com", "x.com", "instagram.com", "youtube.com", "tiktok.com",
+    "pinterest.com", "wikipedia.org", "amazon.co.uk", "amazon.com", "ebay.co.uk", "ebay.com",
+    "google.com", "google.co.uk", "bing.com", "yahoo.com", "duckduckgo.com",
+    # Domain parking / for-sale pages that guessed domains tend to redirect to
+    "sedoparking.com", "sedo.com", "parkingcrew.net", "bodis.com", "dan.com", "afternic.com", "hugedomains.com", "godaddy.com",
+})
+GUESS_TLDS = (".co.uk", ".com", ".uk") # Tried in this order for a guessed domain
+MIN_GUESS_NAME_LENGTH = 6 # Shorter guessed names ("abc.co.uk") too often belong to someone else
+MAX_GUESSES = 6 # Guessed domains probed per company
+# Words left out of guessed domains: legal suffixes (as normalize_company_name spells them) and filler.
+_GUESS_STOP_WORDS = {"ltd", "plc", "llp", "inc", "co", "uk", "the", "and", "of"}
+
+
+def standardize_domain(url_or_netloc):
+    """'https://WWW.Acme.co.uk/contact' or 'www.acme.co.uk' -> 'acme.co.uk', the form EmailScraper keys sites by."""
+    domain = (urlparse(url_or_netloc).netloc if "//" in url_or_netloc else url_or_netloc).lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def is_aggregator(domain):
+    """True for a company information site, directory, social network, registry or parking page."""
+    labels = domain.lower().split(":", 1)[0].rstrip(".").split(".")
+    return any(".".join(labels[start:]) in AGGREGATOR_DOMAINS for start in range(len(labels)))
+
+
+def name_tokens(company_name):
+    """The words of a company name that could appear in its domain ('The Acme Widgets Co. Ltd' -> ['acme', 'widgets'])."""
+    return [word for word in normalize_company_name(company_name).split() if word not in _GUESS_STOP_WORDS]
+
+
+def guess_domains(company_name):
+    """Likely domains for a company, most likely first: 'Acme Widgets Ltd' -> acmewidgets.co.uk,
+       acmewidgets.com, acmewidgets.uk, acme-widgets.co.uk, ... Empty when the name is too short to guess from."""
+    tokens = name_tokens(company_name)
+    spellings = list(dict.fromkeys(["".join(tokens), "-".join(tokens)]))
+    if not tokens or len(spellings[0]) < MIN_GUESS_NAME_LENGTH:
+        return []
+    return [spelling + tld for spelling in spellings for tld in GUESS_TLDS][:MAX_GUESSES]
+
+
+def matches_company_name(domain, company_name):
+    """True if the domain's first label spells out the company name (ignoring hyphens),
+       e.g. acme-widgets.com for 'Acme Widgets Ltd'."""
+    return domain.split(".")[0].replace("-", "") == "".join(name_tokens(company_name))
+
+
+def rank_search_results(urls, company_name):
+    """(domain, url) for each search result that is not an aggregator, one per domain. Domains that
+       contain a word of the company name come first; otherwise the search engine's order is kept."""
+    tokens = [token for token in name_tokens(company_name) if len(token) > 2]
+    candidates = {}
+    for url in urls:
+        domain = standardize_domain(url)
+        if domain and not is_aggregator(domain) and domain not in candidates:
+            candidates[domain] = url
+    return sorted(candidates.items(), key=lambda candidate: not any(token in candidate[0] for token in tokens))
+
+
+def dns_resolves(domain):
+    """Whether domain has an address record. Most guessed domains do not exist, and this is the cheap way to find out."""
+    try:
+        socket.getaddrinfo(domain, 443, proto=socket.IPPROTO_TCP)
+        return True
+    except (socket.gaierror, UnicodeError):
+        return False
+
+
+class DomainResolver:
+    """Finds a company's website by running several discovery strategies as hedged requests and taking
+    the first confident answer.
+
+    A strategy is a function (company_name, cancelled) -> (domain, url) or None, registered under a
+    name. resolve() starts the requested strategies in priority order on a shared thread pool: the
+    next one starts as soon as the previous one comes back empty, or after hedge_delay seconds if it
+    is still running, so a cheap strategy that usually answers quickly (guessing the domain) saves a
+    slow, rate-limited one (a search) most of the time without holding it up when it does not.
+    Once an answer is found `cancelled` is set, so a strategy that has not sent its request yet can
+    give up instead of spending a query. Safe to call from many worker threads; the pool's threads
+    are started on first use."""
+
+    def __init__(self, strategies, max_workers, hedge_delay):
+        self.strategies = dict(strategies)
+        self.max_workers = max_workers
+        self.hedge_delay = hedge_delay
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="domain-resolver")
+            return self._executor
+
+    def resolve(self, company_name, strategy_names):
+        """Returns (domain, url, strategy_name), or (None, None, None) if every strategy came back empty.
+           If none answered and one of them failed, its exception is raised, so the caller can tell
+           "no website" from "could not look"."""
+        executor = self._get_executor()
+        cancelled = threading.Event()
+        waiting = list(strategy_names)
+        running = {}
+        error = None
+        try:
+            while waiting or running:
+                if waiting:
+                    name = waiting.pop(0)
+                    running[executor.submit(self.strategies[name], company_name, cancelled)] = name
+                done, _ = wait(running, timeout=self.hedge_delay if waiting else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        answer = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    if answer:
+                        return answer[0], answer[1], name
+        finally:
+            cancelled.set()
+        if error is not None:
+            raise error
+        return None, None, None
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
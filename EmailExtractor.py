@@ -0,0 +1,355 @@
+import re
+import time
+import logging
+from collections import namedtuple
+from html.parser import HTMLParser
+from urllib.parse import urlparse, urljoin, unquote
+from bs4.dammit import UnicodeDammit
+
+try:
+    import lxml.html
+    import lxml.etree
+except ImportError: # lxml is optional; the html.parser backend needs nothing extra
+    lxml = None
+
+# --- Configuration ---
+EMAIL_EXTRACTOR_BACKEND = "htmlparser" # "htmlparser" (same text nodes as BeautifulSoup's html.parser) or "lxml" (faster, needs lxml)
+MAX_EMAIL_CANDIDATE_LENGTH = 30
+BOUNDARY_DELIMITERS = " :,.()[]<>\"'"
+SCAN_CHUNK_SIZE = 16384 # Characters fed to the streaming parser between early-exit checks
+
+# One pass finds every candidate exactly where the old `re.finditer` + per-character checks did.
+# The optional zero-width `left`/`right` groups never change where a match starts or ends; they
+# only record whether the text on either side is a delimiter (or the start/end of the text node).
+_DELIMITER_CLASS = "[" + re.escape(BOUNDARY_DELIMITERS) + "]"
+EMAIL_CANDIDATE_REGEX = re.compile(
+    r"(?P<left>(?<=" + _DELIMITER_CLASS + r")|^)?"
+    r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+    r"(?P<right>(?=" + _DELIMITER_CLASS + r")|\Z)?"
+)
+
+# Markup with none of these byte sequences cannot contain an "@" in any text node or mailto: link
+# (where it may be percent-encoded), so it is skipped unparsed.
+_AT_SIGN_MARKERS = (b"@", b"&#64", b"&#x40", b"&#X40", b"&commat", b"%40")
+_AT_SIGN_TEXT_MARKERS = tuple(marker.decode('ascii') for marker in _AT_SIGN_MARKERS)
+_LONGEST_AT_SIGN_MARKER = max(len(marker) for marker in _AT_SIGN_MARKERS)
+
+
+def extract_emails_from_text(text):
+    """Returns the valid email candidates in one text node, in order of appearance."""
+    full_text_content = ' '.join(text.split())
+    candidates = []
+    for match in EMAIL_CANDIDATE_REGEX.finditer(full_text_content):
+        if match.group('left') is None or match.group('right') is None:
+            continue
+        if match.end() - match.start() > MAX_EMAIL_CANDIDATE_LENGTH:
+            continue
+        candidates.append(match.group(0))
+    return candidates
+
+
+def might_contain_email(markup, start=0):
+    """Cheap raw-bytes check used to skip parsing pages that have no "@" anywhere (from `start` on)."""
+    markers = _AT_SIGN_TEXT_MARKERS if isinstance(markup, str) else _AT_SIGN_MARKERS
+    return any(markup.find(marker, start) != -1 for marker in markers)
+
+
+def decode_markup(markup):
+    """Decodes response bytes the way BeautifulSoup does (declared encoding, then sniffing)."""
+    if isinstance(markup, str):
+        return markup
+    return UnicodeDammit(markup, is_html=True).unicode_markup or ""
+
+
+PageScan = namedtuple('PageScan', ['emails', 'links'])
+
+
+def same_domain_url(page_url, href, base_domain):
+    """Resolves href against page_url and returns it if it is an http(s) URL on base_domain, else None."""
+    joined_url = urljoin(page_url, href)
+    parsed_joined_url = urlparse(joined_url)
+    if parsed_joined_url.scheme not in ('http', 'https'):
+        return None
+    link_netloc = parsed_joined_url.netloc.lower()
+    if link_netloc.startswith('www.'):
+        link_netloc = link_netloc[4:]
+    return joined_url if link_netloc == base_domain else None
+
+
+class _PageScanner(HTMLParser):
+    """Streams the markup once, collecting email candidates from the same text nodes that
+       BeautifulSoup's html.parser tree would contain (text between tags, comments, declarations
+       and CDATA blocks) and, optionally, new same-domain <a href> links in document order."""
+
+    def __init__(self, page_url=None, base_domain=None, max_links=0, seen_urls=()):
+        super().__init__(convert_charrefs=True)
+        self.page_url = page_url
+        self.base_domain = base_domain
+        self.max_links = max_links
+        self.seen_urls = seen_urls
+        self.emails = {}
+        self.links = {} # url -> list of anchor texts, in document order
+        self._open_link = None # URL of the <a> whose anchor text is being collected
+        self._pending = []
+
+    def _add_text_node(self, text_node):
+        if "@" in text_node:
+            for candidate in extract_emails_from_text(text_node):
+                self.emails.setdefault(candidate, None)
+
+    def _end_data(self):
+        if self._pending:
+            self._add_text_node(''.join(self._pending))
+            self._pending = []
+
+    def wants_links(self):
+        return len(self.links) < self.max_links
+
+    def _add_mailto(self, href):
+        # mailto: targets are harvested directly instead of being fetched
+        address = unquote(href[len("mailto:"):].split('?', 1)[0]).strip()
+        for candidate in extract_emails_from_text(address):
+            self.emails.setdefault(candidate, None)
+
+    def _check_link(self, tag, attrs):
+        if tag != 'a':
+            return
+        self._open_link = None
+        href = None
+        for name, value in attrs: # The last duplicate attribute wins, as in BeautifulSoup
+            if name == 'href':
+                href = value if value is not None else ''
+        if href is None:
+            return
+        if href[:7].lower() == "mailto:":
+            self._add_mailto(href)
+            return
+        if self.max_links <= 0:
+            return
+        joined_url = same_domain_url(self.page_url, href, self.base_domain)
+        if not joined_url or joined_url in self.seen_urls:
+            return
+        if joined_url not in self.links:
+            if not self.wants_links():
+                return
+            self.links[joined_url] = []
+        self.links[joined_url].append(' ') # Separates the anchor texts of repeated links
+        self._open_link = joined_url
+
+    def handle_starttag(self, tag, attrs):
+        self._end_data()
+        self._check_link(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._end_data()
+        if tag == 'a':
+            self._open_link = None
+
+    def handle_startendtag(self, tag, attrs):
+        self._end_data()
+        self._check_link(tag, attrs)
+        self._open_link = None
+
+    def handle_data(self, data):
+        self._pending.append(data)
+        if self._open_link is not None:
+            self.links[self._open_link].append(data)
+
+    def handle_comment(self, data):
+        self._end_data()
+        self._add_text_node(data)
+
+    def handle_decl(self, decl):
+        self._end_data()
+        self._add_text_node(decl[len("DOCTYPE "):])
+
+    def unknown_decl(self, data):
+        self._end_data()
+        self._add_text_node(data[len("CDATA["):] if data.upper().startswith("CDATA[") else data)
+
+    def handle_pi(self, data):
+        self._end_data()
+        self._add_text_node(data)
+
+    def link_list(self):
+        return [(url, ' '.join(''.join(texts).split())) for url, texts in self.links.items()]
+
+    def is_finished(self, text, position):
+        """True once nothing in text[position:] can add a link or an email candidate."""
+        if self.wants_links():
+            return False
+        if any("@" in data for data in self._pending):
+            return False # The open text node still needs its right-hand boundary character
+        # HTMLParser holds back an unfinished entity ("&#6") in rawdata, so the rest of a marker split
+        # across the chunk boundary is looked for from just before `position`.
+        lookback = max(0, position - _LONGEST_AT_SIGN_MARKER + 1)
+        return not might_contain_email(self.rawdata) and not might_contain_email(text, lookback)
+
+    def close(self):
+        super().close()
+        self._end_data()
+
+
+def _scan_page_htmlparser(text, page_url, base_domain, max_links, seen_urls):
+    scanner = _PageScanner(page_url, base_domain, max_links, seen_urls)
+    for chunk_start in range(0, len(text), SCAN_CHUNK_SIZE):
+        chunk_end = chunk_start + SCAN_CHUNK_SIZE
+        scanner.feed(text[chunk_start:chunk_end])
+        if scanner.is_finished(text, chunk_end):
+            return PageScan(list(scanner.emails), scanner.link_list()) # Nothing useful left; skip the rest of the page
+    scanner.close()
+    return PageScan(list(scanner.emails), scanner.link_list())
+
+
+def _scan_page_lxml(text, page_url, base_domain, max_links, seen_urls):
+    try:
+        root = lxml.html.document_fromstring(text)
+    except (lxml.etree.ParserError, ValueError):
+        return PageScan([], [])
+    emails = {}
+    links = {}
+    for element in root.iter():
+        for text_node in (element.text, element.tail):
+            if text_node and "@" in text_node:
+                for candidate in extract_emails_from_text(text_node):
+                    emails.setdefault(candidate, None)
+        href = element.get('href') if element.tag == 'a' else None
+        if href is None:
+            continue
+        if href[:7].lower() == "mailto:":
+            address = unquote(href[len("mailto:"):].split('?', 1)[0]).strip()
+            for candidate in extract_emails_from_text(address):
+                emails.setdefault(candidate, None)
+        elif max_links > 0:
+            joined_url = same_domain_url(page_url, href, base_domain)
+            if joined_url and joined_url not in seen_urls and (joined_url in links or len(links) < max_links):
+                links.setdefault(joined_url, []).append(element.text_content())
+    return PageScan(list(emails), [(url, ' '.join(' '.join(texts).split())) for url, texts in links.items()])
+
+
+def scan_page(markup, page_url=None, base_domain=None, max_links=0, seen_urls=(), backend=None):
+    """Extracts email candidates and up to max_links new same-domain links from a page in one pass.
+
+       Links come back as (url, anchor_text) pairs in document order; addresses in mailto: links
+       are added to the email candidates rather than returned as links. `markup` may be raw
+       response bytes or a decoded string. Links already in `seen_urls` are ignored. With
+       max_links=0 a page without any "@" is not parsed at all."""
+    if not markup or (max_links <= 0 and not might_contain_email(markup)):
+        return PageScan([], [])
+    backend = backend or EMAIL_EXTRACTOR_BACKEND
+    text = decode_markup(markup)
+    if backend == "lxml" and lxml is not None:
+        return _scan_page_lxml(text, page_url, base_domain, max_links, seen_urls)
+    return _scan_page_htmlparser(text, page_url, base_domain, max_links, seen_urls)
+
+
+def extract_emails_from_html(markup, backend=None):
+    """Returns the unique valid email candidates found in the text of an HTML page,
+       in order of first appearance. `markup` may be raw response bytes or a decoded string."""
+    return scan_page(markup, backend=backend).emails
+
+
+# --- Regression corpus ---
+# Each page lists the text candidates the original BeautifulSoup-based extractor returns for it,
+# followed by any extra addresses harvested from mailto: links.
+REGRESSION_CORPUS = [
+    ("<p>Contact: info@acme.co.uk</p>", ["info@acme.co.uk"], []),
+    ("<p>Email sales@acme.co.uk, or call</p><p>(jobs@acme.co.uk)</p>", ["sales@acme.co.uk", "jobs@acme.co.uk"], []),
+    ("<p>mail:foo@bar.com!</p>", [], []),
+    ("<p>x#foo@bar.com</p>", [], []),
+    ("<p>foo@bar.example.com!</p>", [], []),
+    ("<p>foo@bar.com-x@y.com</p>", [], []),
+    ("<p>a.very.long.local.part@averylongdomainname.co.uk</p>", [], []),
+    ("<p>  spaced\n\t out   hello@site.org  </p>", ["hello@site.org"], []),
+    ("<p>info&#64;acme.co.uk</p>", ["info@acme.co.uk"], []),
+    ("<p>info&commat;acme.co.uk</p>", ["info@acme.co.uk"], []),
+    ('<a href="mailto:hidden@acme.co.uk">Email us</a>', [], ["hidden@acme.co.uk"]),
+    ('<a href="MAILTO:Sales%40acme.co.uk?subject=Hi">Sales@acme.co.uk</a>', ["Sales@acme.co.uk"], []),
+    ('<a href="mailto:someone.with.a.long.name@acme-engineering.co.uk">Email</a>', [], []),
+    ('<a href="mailto:info%40acme.co.uk">Email us</a>', [], ["info@acme.co.uk"]),
+    ("<p>" + "y" * 20000 + '</p><a href="mailto:sales%40acme.co.uk">Email us</a>', [], ["sales@acme.co.uk"]),
+    ("<p>split<b>@</b>acme.co.uk</p>", [], []),
+    ("<p><b>bold@acme.co.uk</b> and [box@acme.co.uk]</p>", ["bold@acme.co.uk", "box@acme.co.uk"], []),
+    ("<script>var e = 'script@acme.co.uk';</script>", ["script@acme.co.uk"], []),
+    ("<!-- comment@acme.co.uk -->", ["comment@acme.co.uk"], []),
+    ("<p>UPPER@ACME.CO.UK and dup@acme.co.uk dup@acme.co.uk</p>", ["UPPER@ACME.CO.UK", "dup@acme.co.uk"], []),
+    ("<p>no emails here</p>", [], []),
+    ("<p>user@localhost</p>", [], []),
+]
+# Pages longer than SCAN_CHUNK_SIZE whose entity-encoded "@" is split across the first chunk boundary
+# (the corpus pages are wrapped in "<html><body>", so the "&" lands `split` characters before it).
+REGRESSION_CORPUS += [
+    ("<p>" + "y" * (SCAN_CHUNK_SIZE - 20 - split) + f" info{entity}acme.co.uk</p>" + "z" * 20000, ["info@acme.co.uk"], [])
+    for entity in ("&#64;", "&commat;") for split in range(1, len(entity))
+]
+
+
+def _legacy_extract_emails(markup):
+    """The original extraction logic from scrape_site_for_email_context, kept as the reference."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(markup, 'html.parser')
+    email_contexts = {}
+    for text_node in soup.find_all(string=lambda text: text and "@" in text):
+        full_text_content = ' '.join(text_node.strip().split())
+        for match in re.finditer(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", full_text_content):
+            candidate, start_index, end_index = match.group(0), match.start(0), match.end(0)
+            if len(candidate) > MAX_EMAIL_CANDIDATE_LENGTH:
+                continue
+            if start_index != 0 and full_text_content[start_index - 1] not in BOUNDARY_DELIMITERS:
+                continue
+            if end_index != len(full_text_content) and full_text_content[end_index] not in BOUNDARY_DELIMITERS:
+                continue
+            email_contexts.setdefault(candidate, None)
+    return list(email_contexts)
+
+
+LINK_CORPUS_PAGE = """<html><body>
+<a href="/contact">Contact</a> <a href="https://www.acme.co.uk/about">About</a> <a href="/contact">Again</a>
+<a href="#top">Top</a> <a href="mailto:info@acme.co.uk">Mail</a> <a href="https://other.example/x">Other</a>
+<a href="">Self</a> <a href>Bare</a> <a>No href</a> <A HREF="Team.html">Team</A> <a href="tel:0161">Call</a>
+</body></html>"""
+
+
+def _legacy_extract_links(markup, page_url, base_domain, seen_urls):
+    """The original link loop from scrape_site_for_email_context, kept as the reference."""
+    from bs4 import BeautifulSoup
+    links = []
+    for link in BeautifulSoup(markup, 'html.parser').find_all('a', href=True):
+        joined_url = same_domain_url(page_url, link['href'], base_domain)
+        if joined_url and joined_url not in seen_urls and joined_url not in links:
+            links.append(joined_url)
+    return links
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    backends = ["htmlparser"] + (["lxml"] if lxml is not None else [])
+    failures = 0
+    for markup, expected_text, expected_mailto in REGRESSION_CORPUS:
+        page = f"<html><body>{markup}</body></html>".encode('utf-8')
+        results = {"legacy": (_legacy_extract_emails(page), expected_text)}
+        results.update({backend: (extract_emails_from_html(page, backend), expected_text + expected_mailto) for backend in backends})
+        for name, (result, expected) in results.items():
+            if sorted(result) != sorted(expected):
+                failures += 1
+                logging.error(f"{name} extractor returned {result} for {markup!r}, expected {expected}")
+    page_url = "https://acme.co.uk/index.html"
+    expected_links = _legacy_extract_links(LINK_CORPUS_PAGE, page_url, "acme.co.uk", {page_url})
+    for backend in backends:
+        links = [url for url, anchor_text in scan_page(LINK_CORPUS_PAGE, page_url, "acme.co.uk", 100, {page_url}, backend).links]
+        if links != expected_links:
+            failures += 1
+            logging.error(f"{backend} scanner returned links {links}, expected {expected_links}")
+    logging.info(f"Regression corpus: {len(REGRESSION_CORPUS) + 1} pages, {failures} mismatch(es).")
+    if failures:
+        raise SystemExit(1) # The same checks run under pytest: python -m pytest test_EmailExtractor.py
+
+    # Rough throughput comparison on a mid-sized page
+    filler = "<div><p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p><a href='/x'>link</a></div>" * 300
+    page = f"<html><body>{filler}<p>Contact: info@acme.co.uk</p>{filler}</body></html>".encode('utf-8')
+    for name, extract in [("legacy", _legacy_extract_emails)] + [(b, lambda m, b=b: extract_emails_from_html(m, b)) for b in backends]:
+        started = time.perf_counter()
+        for _ in range(20):
+            extract(page)
+        elapsed = time.perf_counter() - started
+        logging.info(f"{name:>10}: {20 / elapsed:8.1f} pages/sec")
@@ -1,111 +1,363 @@
+import argparse
+import hashlib
+import os
+import numpy as np
 import pandas as pd
+import re
 import requests
-from bs4 import BeautifulSoup
+import sys
 from googlesearch import search as google_search
-from urllib.parse import urlparse, urljoin
-import time
-import re
-from collections import deque
+from urllib.parse import urlparse, urldefrag
+import heapq
+import itertools
 import logging
-import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from DomainCache import DomainCache
+from DomainResolver import DomainResolver, dns_resolves, guess_domains, is_aggregator, matches_company_name, rank_search_results, standardize_domain
+from EmailExtractor import scan_page
+from ResponseCache import ResponseCache
+from ResultWriter import open_result_writer, iter_column_values
+from ParsePool import ParsePool, default_parse_workers, map_in_order
+from Metrics import Metrics
+from RateLimiter import HostRateLimiter, THROTTLE_STATUS_CODES, retry_after_seconds
 
 # --- Configuration ---
 INPUT_CSV_NAME = 'CH_MLB.csv'
 OUTPUT_CSV_NAME = 'CH_MLB_with_domains_emails_v3.csv' # Updated output name
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 REQUEST_TIMEOUT = 10  # seconds
-DELAY_BETWEEN_GOOGLE_SEARCHES = 5 # seconds
-DELAY_BETWEEN_PAGE_REQUESTS = 1 # seconds
+GOOGLE_REQUESTS_PER_SECOND = 0.2 # Starting pace for Google searches (one every 5 seconds)
+GOOGLE_MAX_REQUESTS_PER_SECOND = 0.5 # Fastest pace Google is allowed to reach while it stays healthy
+SITE_REQUESTS_PER_SECOND = 1 # Starting pace per company website
+SITE_MAX_REQUESTS_PER_SECOND = 4 # Fastest pace per company website
 MAX_PAGES_TO_CRAWL_PER_SITE = 2  # <<<< MODIFIED: Check at most two pages
+MAX_LINKS_CONSIDERED_PER_PAGE = 200 # Same-domain links scored per page when choosing what to crawl next
 MAX_GOOGLE_RESULTS_TO_CHECK = 5
+DOMAIN_DISCOVERY_STRATEGIES = ("guess", "search") # Hedged in this order: "guess" probes domains spelled from the name, "search" asks Google
+DOMAIN_GUESS_HEAD_START = 2 # Seconds a domain guess runs on its own before a Google search is started alongside it
+DOMAIN_PROBE_TIMEOUT = 5 # seconds, for the HEAD request to a guessed domain
 COMPANIES_HOUSE_DOMAIN = "find-and-update.company-information.service.gov.uk"
 MAX_COMPANIES_TO_PROCESS = 150
+MAX_CONCURRENT_COMPANIES = 8 # Companies looked up and crawled at once (1 = one at a time)
+INPUT_CHUNK_SIZE = 10000 # Input rows read at a time, so memory stays flat on multi-million-row exports
+MAX_COMPANIES_IN_FLIGHT = 4 * MAX_CONCURRENT_COMPANIES # Rows queued for the workers ahead of the output writer
+PARSE_WORKERS = default_parse_workers(MAX_CONCURRENT_COMPANIES) # Processes parsing fetched pages (0 = parse on the fetching thread)
+SIC_CODE_FILTER = () # Only enrich companies whose SIC columns contain one of these, e.g. ("28150", "25620"). Empty = all
+LOCATION_FILTER = () # Only enrich companies whose address/location columns contain one of these, e.g. ("Manchester",). Empty = all
+COMPANY_NAME_COLUMNS = ('Company Name', 'CompanyName') # MainScraper output / Companies House bulk data
+GOOGLE_THROTTLE_KEY = "google.com" # Rate limiter key shared by all Google searches
+DOMAIN_CACHE_FILE = 'domain_cache.sqlite3' # Persistent cache of Google domain lookups
+DOMAIN_CACHE_TTL_DAYS = 30 # How long a found domain is trusted
+DOMAIN_CACHE_NEGATIVE_TTL_DAYS = 7 # How long a "no website found" result is trusted
+MAX_DOMAIN_RESULTS_MEMO = 10000 # Crawled sites whose emails are remembered for the rest of the run (least recently used dropped first)
+HTTP_CACHE_DIR = 'http_cache' # On-disk cache of fetched pages, revalidated with ETag/Last-Modified (shared with MainScraper.py)
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Path / anchor-text cues used to rank which page of a site to crawl next (higher = sooner).
+CONTACT_LINK_CUES = {
+    "contact": 10, "get-in-touch": 9, "get in touch": 9, "enquir": 8, "reach-us": 7, "email": 6,
+    "about": 5, "team": 4, "people": 3, "staff": 3, "office": 2, "location": 2,
+}
+LOW_VALUE_LINK_CUES = {
+    "cookie": -8, "privacy": -8, "terms": -6, "policy": -5, "login": -6, "account": -5,
+    "basket": -6, "cart": -6, "blog": -4, "news": -4, "careers": -2,
+}
+LOW_VALUE_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.zip', '.doc', '.docx', '.xls', '.xlsx')
+
+# --- Politeness / Connection Handling ---
+# Token buckets shared by all workers: each host is slowed down when it pushes back (429/503)
+# and sped up again while it answers normally.
+google_rate_limiter = HostRateLimiter(GOOGLE_REQUESTS_PER_SECOND, GOOGLE_MAX_REQUESTS_PER_SECOND)
+site_rate_limiter = HostRateLimiter(SITE_REQUESTS_PER_SECOND, SITE_MAX_REQUESTS_PER_SECOND)
+_thread_local = threading.local()
+domain_cache = DomainCache(DOMAIN_CACHE_FILE, DOMAIN_CACHE_TTL_DAYS * 86400, DOMAIN_CACHE_NEGATIVE_TTL_DAYS * 86400)
+metrics = Metrics("email_scraper") # Per-stage counters and latency histograms for this run
+response_cache = ResponseCache(HTTP_CACHE_DIR) # None = no caching; .offline = True replays pages from the cache only
+
+def wait_for_rate_limit(limiter, host, cancelled=None):
+    """Blocks until `limiter` lets this thread send a request to `host`.
+       Requests to different hosts are not held up by each other. Returns False, without using up
+       a slot, if the threading.Event `cancelled` is set first."""
+    waited = limiter.acquire(host, cancelled)
+    if waited is None:
+        return False
+    if waited:
+        metrics.observe("politeness_wait", waited)
+    return True
+
+def report_response(limiter, host, status_code, headers=None):
+    """Feeds a response status back into `limiter` so the host's pace adapts to it."""
+    if status_code in THROTTLE_STATUS_CODES:
+        metrics.increment("throttled_responses")
+        limiter.report_throttled(host, retry_after_seconds(headers))
+        logging.warning(f"{host} answered {status_code}; slowing down to {limiter.current_rate(host):.2f} requests/s.")
+    else:
+        limiter.report_success(host)
+
+def is_offline():
+    return response_cache is not None and response_cache.offline
+
+def fetch_page(url, headers):
+    """GETs url (following redirects) through the response cache, if there is one."""
+    if response_cache is None:
+        return get_http_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+    response = response_cache.get(get_http_session(), url, headers=headers, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+    metrics.increment(f"http_cache_{response.cache_status}")
+    return response
+
+def get_http_session():
+    """Returns a keep-alive requests.Session private to the calling worker thread."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({'User-Agent': USER_AGENT})
+        _thread_local.session = session
+    return session
+
 # --- Helper Functions ---
 
-def get_domain_from_google(company_name):
-    """
-    Searches Google for 'company_name UK' and returns the domain and full URL
-    of the first result that is not a Companies House website.
-    """
+def search_engine_strategy(company_name, cancelled):
+    """Domain discovery strategy "search": Googles 'company_name UK' and takes the best ranked result
+    that is not a registry, directory or other aggregator site. Gives up without searching if another
+    strategy answered while this one waited for its rate-limit slot; such a search takes no slot."""
     query = f"{company_name} UK"
+    if cancelled.is_set() or not wait_for_rate_limit(google_rate_limiter, GOOGLE_THROTTLE_KEY, cancelled):
+        metrics.increment("google_searches_saved")
+        return None
     logging.info(f"Googling for: {query}")
     try:
-        search_results_iterator = google_search(
-            query,
-            num_results=MAX_GOOGLE_RESULTS_TO_CHECK,
-            lang="en"
-        )
-
-        results_checked = 0
-        for url in search_results_iterator:
-            if results_checked >= MAX_GOOGLE_RESULTS_TO_CHECK:
-                break
-            results_checked += 1
-
-            parsed_url = urlparse(url)
-            domain_netloc = parsed_url.netloc.lower()
-
-            current_domain_standardized = domain_netloc
-            if current_domain_standardized.startswith('www.'):
-                current_domain_standardized = current_domain_standardized[4:]
-
-            if "compan" in current_domain_standardized or "gazette" in current_domain_standardized or "guide" in current_domain_standardized:
-                logging.info(f"Skipping Companies House / company platform link: {url}")
-                continue
+        with metrics.timer("google_search"):
+            search_results = list(google_search(
+                query,
+                num_results=MAX_GOOGLE_RESULTS_TO_CHECK,
+                lang="en"
+            ))[:MAX_GOOGLE_RESULTS_TO_CHECK]
+    except Exception as e:
+        error_response = getattr(e, 'response', None) # googlesearch raises HTTPError on 429 "Too Many Requests"
+        if error_response is not None:
+            report_response(google_rate_limiter, GOOGLE_THROTTLE_KEY, error_response.status_code, error_response.headers)
+        raise
+    report_response(google_rate_limiter, GOOGLE_THROTTLE_KEY, 200)
+
+    candidates = rank_search_results(search_results, company_name)
+    if not candidates:
+        logging.info(f"Only registry/directory sites in the top {len(search_results)} Google results for {company_name}.")
+        return None
+    return candidates[0]
+
+
+def domain_guess_strategy(company_name, cancelled):
+    """Domain discovery strategy "guess": tries domains spelled from the company name (acmewidgets.co.uk,
+    acmewidgets.com, ...). A guess counts only if it resolves in DNS and its home page answers a HEAD
+    request without redirecting to a differently named site (parking pages, resellers)."""
+    for guess in guess_domains(company_name):
+        if cancelled.is_set():
+            return None
+        if not dns_resolves(guess):
+            continue
+        if not wait_for_rate_limit(site_rate_limiter, guess, cancelled):
+            return None
+        try:
+            with metrics.timer("domain_probe"):
+                response = get_http_session().head(f"https://{guess}/", timeout=DOMAIN_PROBE_TIMEOUT, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            logging.debug(f"Probe of guessed domain {guess} failed: {e}")
+            continue
+        report_response(site_rate_limiter, guess, response.status_code, response.headers)
+        final_domain = standardize_domain(response.url)
+        if response.status_code >= 400 and response.status_code != 405: # 405: the site only refuses HEAD
+            continue
+        if is_aggregator(final_domain) or not matches_company_name(final_domain, company_name):
+            logging.info(f"Guessed domain {guess} redirects to {final_domain}; not using it.")
+            continue
+        return final_domain, response.url
+    return None
 
-            domain_to_return = domain_netloc
-            if domain_to_return.startswith('www.'):
-                domain_to_return = domain_to_return[4:]
-            
-            logging.info(f"Found potential domain: {domain_to_return} from {url}")
-            return domain_to_return, url
-        
-        logging.warning(f"No suitable non-Companies House website found in the top {results_checked} Google results for {company_name}.")
+
+domain_resolver = DomainResolver({"guess": domain_guess_strategy, "search": search_engine_strategy},
+                                 max_workers=2 * max(1, MAX_CONCURRENT_COMPANIES), hedge_delay=DOMAIN_GUESS_HEAD_START)
+
+
+def resolve_company_domain(company_name):
+    """
+    Finds the website of company_name and returns its domain and the URL to start crawling from,
+    or (None, None). The DOMAIN_DISCOVERY_STRATEGIES are raced through domain_resolver.
+    Answers are cached on disk, so repeat lookups skip the search and its delay. A lookup that
+    fails (Google or network error) raises instead, and nothing is cached for it.
+    """
+    cache_hit, cached_domain, cached_url = domain_cache.get(company_name)
+    if cache_hit:
+        metrics.increment("domain_cache_hits")
+        logging.info(f"Domain cache hit for {company_name}: {cached_domain or 'no website'}")
+        return (sys.intern(cached_domain) if cached_domain else cached_domain), cached_url
+    metrics.increment("domain_cache_misses")
+    if is_offline():
+        logging.warning(f"Offline: no cached domain for {company_name}, skipping the website lookup.")
         return None, None
 
-    except Exception as e:
-        logging.error(f"Error during Google search for {company_name}: {e}")
+    domain, url, strategy = domain_resolver.resolve(company_name, DOMAIN_DISCOVERY_STRATEGIES)
+    if domain is None:
+        logging.warning(f"No suitable website found for {company_name}.")
+        domain_cache.put(company_name, None, None)
         return None, None
-    finally:
-        time.sleep(DELAY_BETWEEN_GOOGLE_SEARCHES)
+    metrics.increment(f"domains_found_by_{strategy}")
+    logging.info(f"Found potential domain: {domain} from {url} ({strategy})")
+    domain_cache.put(company_name, domain, url)
+    return sys.intern(domain), url
+
+
+def score_link(url, anchor_text):
+    """Scores how likely a link is to lead to contact details, from its path and anchor text."""
+    path = urlparse(url).path.lower()
+    if path.endswith(LOW_VALUE_EXTENSIONS):
+        return -10
+    anchor_text = anchor_text.lower()
+    score = 0
+    for cues in (CONTACT_LINK_CUES, LOW_VALUE_LINK_CUES):
+        for cue, weight in cues.items():
+            if cue in path:
+                score += weight
+            if cue in anchor_text:
+                score += weight
+    return score
+
+
+class CrawlFrontier:
+    """The URLs still to crawl on one site, popped best-scored first. Ties keep discovery order,
+       so a site with no contact cues is crawled in the same order as a plain BFS.
+
+       seen_urls is bounded by the crawl's own budget (MAX_PAGES_TO_CRAWL_PER_SITE pages of at most
+       MAX_LINKS_CONSIDERED_PER_PAGE links) and is freed with the frontier when the crawl ends."""
+
+    def __init__(self, start_url):
+        self._heap = []
+        self._order = itertools.count()
+        self.seen_urls = set()  # Every URL ever queued (visited or still waiting), for O(1) de-duplication
+        self.push(start_url, 0)
+
+    def push(self, url, score):
+        if url in self.seen_urls:
+            return False
+        self.seen_urls.add(url)
+        heapq.heappush(self._heap, (-score, next(self._order), url))
+        return True
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class CompanyJob:
+    """One input row waiting for, or being, processed. Only the row's values are kept, not a DataFrame slice."""
+    __slots__ = ("position", "company_name", "values")
+
+    def __init__(self, position, company_name, values):
+        self.position = position
+        self.company_name = company_name
+        self.values = values # Tuple of the row's values, in output column order
+
+
+class CompanyResult:
+    """What process_company found for one company. Domains are interned, so every company of the same
+       site shares one string, and the emails tuple is shared with the site's memo entry."""
+    __slots__ = ("domain", "emails")
+
+    def __init__(self, domain="", emails=()):
+        self.domain = domain
+        self.emails = emails
+
+    def output_values(self):
+        """The company_domain and company_email column values."""
+        return self.domain, "; ".join(self.emails)
+
+
+class DomainResultMemo:
+    """In-run memo of crawl results per website domain, bounded as an LRU.
+
+    Group subsidiaries, holding companies and trading names often resolve to the same site; each
+    site is crawled once and its emails are handed to every company that resolves to it. Workers
+    asking for a domain whose crawl is still running wait for that crawl instead of starting another."""
+
+    def __init__(self, max_domains):
+        self.max_domains = max_domains
+        self._results = OrderedDict() # domain -> Future while the crawl runs, then the bare result (a Future is ~1 KB)
+        self._lock = threading.Lock()
+
+    def get_or_crawl(self, domain, crawl):
+        """Returns (result, reused): crawl()'s result for domain, computed at most once while remembered."""
+        crawl_here = False
+        with self._lock:
+            entry = self._results.get(domain)
+            if entry is not None:
+                self._results.move_to_end(domain)
+                if not isinstance(entry, Future):
+                    return entry, True
+                future = entry
+            else:
+                future = self._results[domain] = Future()
+                while len(self._results) > self.max_domains:
+                    self._results.popitem(last=False)
+                crawl_here = True
+        if not crawl_here:
+            return future.result(), True
+        try:
+            result = crawl()
+        except BaseException as e:
+            with self._lock:
+                if self._results.get(domain) is future:
+                    del self._results[domain] # Let a later company try this site again
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self._results.get(domain) is future:
+                self._results[domain] = result
+        future.set_result(result)
+        return result, False
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
 
 
-def scrape_site_for_email_context(start_url, base_domain):
+domain_results = DomainResultMemo(MAX_DOMAIN_RESULTS_MEMO) # Emptied at the start of each run
+
+
+def scrape_site_for_email_context(start_url, base_domain, parse_pool=None):
     """Crawls a website (max MAX_PAGES_TO_CRAWL_PER_SITE pages) starting from start_url,
-       staying within base_domain, and extracts valid email candidates based on specific criteria."""
+       staying within base_domain, and extracts valid email candidates based on specific criteria.
+       Pages are parsed in parse_pool's worker processes if given, else on this thread."""
     if not start_url or not base_domain:
         return []
+    parse_pool = parse_pool or ParsePool(0)
 
-    urls_to_visit = deque([start_url])
-    visited_urls = set()
+    urls_to_visit = CrawlFrontier(start_url)
     email_contexts = set()  # Stores validated email candidates
     pages_crawled = 0
 
     headers = {'User-Agent': USER_AGENT} # Assuming USER_AGENT is defined globally
 
-    # --- Constants for email extraction ---
-    EMAIL_REGEX_PATTERN = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-    BOUNDARY_DELIMITERS = [' ', ':', ',', '.', '(', ')', '[', ']', '<', '>', '"', "'"] # Added more common delimiters
-    MAX_EMAIL_CANDIDATE_LENGTH = 30
-    # ---
-
     logging.info(f"Starting crawl for {base_domain}, max {MAX_PAGES_TO_CRAWL_PER_SITE} page(s).") # Assuming MAX_PAGES_TO_CRAWL_PER_SITE is global
 
     while urls_to_visit and pages_crawled < MAX_PAGES_TO_CRAWL_PER_SITE: # Assuming MAX_PAGES_TO_CRAWL_PER_SITE is global
-        current_url = urls_to_visit.popleft()
-
-        if current_url in visited_urls:
-            continue
+        current_url = urls_to_visit.pop()
 
         logging.info(f"Crawling page {pages_crawled + 1}/{MAX_PAGES_TO_CRAWL_PER_SITE}: {current_url}") # Assuming MAX_PAGES_TO_CRAWL_PER_SITE is global
-        visited_urls.add(current_url)
         pages_crawled += 1
 
         try:
-            response = requests.get(current_url, headers=headers, timeout=REQUEST_TIMEOUT, allow_redirects=True) # Assuming REQUEST_TIMEOUT is global
+            if not is_offline():
+                wait_for_rate_limit(site_rate_limiter, base_domain)
+            with metrics.timer("page_fetch"):
+                response = fetch_page(current_url, headers)
+            metrics.increment("pages_fetched")
+            if not is_offline():
+                report_response(site_rate_limiter, base_domain, response.status_code, response.headers)
             response.raise_for_status()
 
             final_url_netloc = urlparse(response.url).netloc.lower()
@@ -114,86 +366,35 @@ def scrape_site_for_email_context(start_url, base_domain):
 
             if final_url_netloc != base_domain:
                 logging.warning(f"Response URL {response.url} (domain: {final_url_netloc}) is off base domain {base_domain}. Skipping content and links from this page.")
-                time.sleep(DELAY_BETWEEN_PAGE_REQUESTS) # Assuming DELAY_BETWEEN_PAGE_REQUESTS is global
                 continue
 
             content_type = response.headers.get('Content-Type', '').lower()
             if 'html' not in content_type:
                 logging.info(f"Skipping non-HTML content at {current_url} (type: {content_type})")
-                time.sleep(DELAY_BETWEEN_PAGE_REQUESTS) # Assuming DELAY_BETWEEN_PAGE_REQUESTS is global
                 continue
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Find all text nodes that contain an "@" symbol
-            texts_with_at_symbol = soup.find_all(string=lambda text: text and "@" in text)
+            # Links are only worth scoring while the page budget allows another fetch; on the
+            # last page this also lets the scanner stop early.
+            links_needed = MAX_LINKS_CONSIDERED_PER_PAGE if pages_crawled < MAX_PAGES_TO_CRAWL_PER_SITE else 0 # Assuming MAX_PAGES_TO_CRAWL_PER_SITE is global
+            # Parse, email extraction and link collection are one pass, run in a parse worker process
+            page_scan, parse_seconds = parse_pool.submit(scan_page, response.content, current_url, base_domain,
+                                                         links_needed, urls_to_visit.seen_urls).result()
+            metrics.observe("page_parse", parse_seconds)
+            metrics.increment("emails_extracted", len(page_scan.emails))
 
-            for text_node in texts_with_at_symbol:
-                # Get the full text content of the node, clean whitespace
-                full_text_content = ' '.join(text_node.strip().split())
-                if not full_text_content:
-                    continue
+            # Includes addresses harvested straight from mailto: links, which are never fetched
+            for email_candidate in page_scan.emails:
+                email_contexts.add(email_candidate)
+                logging.debug(f"Found potential email: {email_candidate} in {current_url}")
 
-                # Iterate through potential email matches in the text content
-                for match in re.finditer(EMAIL_REGEX_PATTERN, full_text_content):
-                    email_candidate = match.group(0)
-                    start_index = match.start(0)
-                    end_index = match.end(0)
-
-                    # 1. Check length limit
-                    if len(email_candidate) > MAX_EMAIL_CANDIDATE_LENGTH:
-                        continue
-
-                    # 2. Check left boundary
-                    is_left_boundary_ok = False
-                    if start_index == 0: # Email candidate is at the beginning of the text
-                        is_left_boundary_ok = True
-                    else:
-                        left_char = full_text_content[start_index - 1]
-                        if left_char in BOUNDARY_DELIMITERS:
-                            is_left_boundary_ok = True
-                    
-                    if not is_left_boundary_ok:
-                        continue
-
-                    # 3. Check right boundary
-                    is_right_boundary_ok = False
-                    if end_index == len(full_text_content): # Email candidate is at the end of the text
-                        is_right_boundary_ok = True
-                    else:
-                        right_char = full_text_content[end_index]
-                        if right_char in BOUNDARY_DELIMITERS:
-                            is_right_boundary_ok = True
-                    
-                    # If all conditions are met, add the validated email candidate
-                    if is_right_boundary_ok:
-                        email_contexts.add(email_candidate)
-                        logging.debug(f"Found potential email: {email_candidate} in {current_url}")
-
-
-            # Only add new links if we haven't reached the page limit for adding to queue
-            if pages_crawled < MAX_PAGES_TO_CRAWL_PER_SITE: # Assuming MAX_PAGES_TO_CRAWL_PER_SITE is global
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    joined_url = urljoin(current_url, href)
-                    parsed_joined_url = urlparse(joined_url)
-
-                    if parsed_joined_url.scheme in ['http', 'https']:
-                        link_netloc = parsed_joined_url.netloc.lower()
-                        if link_netloc.startswith('www.'):
-                            link_netloc = link_netloc[4:]
-                        
-                        if link_netloc == base_domain and joined_url not in visited_urls and joined_url not in urls_to_visit:
-                            urls_to_visit.append(joined_url)
-            
-            time.sleep(DELAY_BETWEEN_PAGE_REQUESTS) # Assuming DELAY_BETWEEN_PAGE_REQUESTS is global
+            for joined_url, anchor_text in page_scan.links:
+                joined_url = urldefrag(joined_url)[0] # '#section' links point back at a page we already have
+                urls_to_visit.push(joined_url, score_link(joined_url, anchor_text))
 
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching {current_url}: {e}")
-            time.sleep(DELAY_BETWEEN_PAGE_REQUESTS) # Assuming DELAY_BETWEEN_PAGE_REQUESTS is global
         except Exception as e:
             logging.error(f"Unexpected error processing {current_url}: {e}")
-            time.sleep(DELAY_BETWEEN_PAGE_REQUESTS) # Assuming DELAY_BETWEEN_PAGE_REQUESTS is global
 
     if email_contexts:
         logging.info(f"Found {len(email_contexts)} unique potential email addresses on {base_domain} (from {pages_crawled} page(s) crawled).")
@@ -203,64 +404,203 @@ def scrape_site_for_email_context(start_url, base_domain):
     return list(email_contexts)
 
 
-# --- Main Script ---
-if __name__ == "__main__":
-    try:
-        df = pd.read_csv(INPUT_CSV_NAME)
-    except FileNotFoundError:
-        logging.error(f"Input file '{INPUT_CSV_NAME}' not found.")
-        print(f"Creating a dummy '{INPUT_CSV_NAME}' for demonstration.")
+def process_company(position, company_name, total, parse_pool=None):
+    """Resolves the website for one company and crawls it for email candidates. Returns a CompanyResult,
+       or None if the website lookup failed, so that the company is not written and --resume retries it."""
+    if not company_name:
+        logging.warning(f"Skipping row {position+1} due to empty Company Name.")
+        return CompanyResult()
+
+    progress = f"{position + 1}/{total}" if total else f"#{position + 1}"
+    logging.info(f"\n--- Processing Company: {company_name} ({progress}) ---")
+
+    with metrics.timer("company_total"):
+        with metrics.timer("domain_lookup"):
+            try:
+                domain, start_url = resolve_company_domain(company_name)
+            except Exception as e:
+                logging.error(f"Error while looking up the website of {company_name}: {e}")
+                metrics.increment("domain_lookup_errors")
+                return None
+
+        if domain and start_url:
+            with metrics.timer("site_crawl"):
+                contexts, reused = domain_results.get_or_crawl(domain, lambda: tuple(scrape_site_for_email_context(start_url, domain, parse_pool)))
+            if reused:
+                metrics.increment("site_crawls_reused")
+                logging.info(f"  {domain} was already crawled this run; reusing its {len(contexts)} email(s).")
+            metrics.increment("companies_with_emails" if contexts else "companies_without_emails")
+            return CompanyResult(domain, contexts)
+        metrics.increment("companies_without_domain")
+        return CompanyResult()
+
+
+class NameDigestSet:
+    """Exact set of company names held as a sorted array of their 64-bit blake2b digests: 8 bytes per
+       name however long it is, instead of a set of the strings. Two different names would have to share
+       a digest to be confused, which for a few million names is about a 1 in 10^7 chance per run."""
+
+    def __init__(self, names=()):
+        self._digests = np.unique(np.fromiter((self.digest(name) for name in names), dtype=np.uint64))
+
+    @staticmethod
+    def digest(name):
+        return int.from_bytes(hashlib.blake2b(name.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+    def __contains__(self, name):
+        digest = np.uint64(self.digest(name))
+        index = np.searchsorted(self._digests, digest)
+        return index < len(self._digests) and self._digests[index] == digest
+
+    def __len__(self):
+        return len(self._digests)
+
+    @property
+    def size_in_bytes(self):
+        return self._digests.nbytes
+
+
+def load_completed_company_names(output_name, name_column='Company Name'):
+    """Returns the company names already written to output_name (CSV or Parquet) by an earlier run, as a
+       NameDigestSet rather than a set of every name."""
+    return NameDigestSet(name.strip() for name in iter_column_values(output_name, name_column)) # Same normalisation as the input rows
+
+
+def read_input_chunks(input_csv_name, chunk_size=INPUT_CHUNK_SIZE):
+    """Yields the input CSV as DataFrames of at most chunk_size rows. Column names are stripped,
+       since the Companies House bulk files have headers such as ' CompanyNumber'."""
+    for chunk in pd.read_csv(input_csv_name, chunksize=chunk_size, dtype=str): # str keeps company numbers' leading zeros
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def filter_companies(chunk, sic_codes=SIC_CODE_FILTER, locations=LOCATION_FILTER):
+    """Keeps the rows of chunk matching any of sic_codes (in a SIC column) and any of locations
+       (in a location/address column), case-insensitively. This runs before any network work."""
+    for needles, column_cues in ((sic_codes, ('sic',)), (locations, ('location', 'address', 'posttown', 'county', 'postcode'))):
+        if not needles:
+            continue
+        columns = [column for column in chunk.columns if any(cue in column.lower().replace('.', '') for cue in column_cues)]
+        if not columns:
+            logging.warning(f"No columns to filter on for {needles}; expected a column named like {column_cues}.")
+            continue
+        pattern = "|".join(re.escape(str(needle)) for needle in needles)
+        matches = pd.Series(False, index=chunk.index)
+        for column in columns:
+            matches |= chunk[column].astype(str).str.contains(pattern, case=False, regex=True, na=False)
+        chunk = chunk[matches]
+    return chunk
+
+
+def enrich_companies_csv(input_csv_name=INPUT_CSV_NAME, output_csv_name=OUTPUT_CSV_NAME, resume=False, metrics_file=None,
+                         sic_codes=SIC_CODE_FILTER, locations=LOCATION_FILTER):
+    """Adds company_domain and company_email columns to the companies in input_csv_name that match
+       sic_codes/locations, appending each finished row to output_csv_name (CSV, or Parquet if it ends in
+       .parquet; see ResultWriter.py). The input is streamed in INPUT_CHUNK_SIZE chunks, so memory does
+       not grow with its size. Logs a per-stage timing summary at the end and, if metrics_file is given,
+       dumps the metrics there (JSON, or Prometheus text for *.prom)."""
+    if not os.path.exists(input_csv_name):
+        logging.error(f"Input file '{input_csv_name}' not found.")
+        print(f"Creating a dummy '{input_csv_name}' for demonstration.")
         dummy_data = {
             'Company Name': ['Acme Corp Ltd', 'Beta Solutions Inc', 'Gamma Innovations', 'NonExistent Company XYZ', 'HM Revenue & Customs'],
             'OtherData': [1,2,3,4,5]
             }
-        df = pd.DataFrame(dummy_data)
-        df.to_csv(INPUT_CSV_NAME, index=False)
+        pd.DataFrame(dummy_data).to_csv(input_csv_name, index=False)
         # exit()
 
-    if 'Company Name' not in df.columns:
-        logging.error(f"'Company Name' column not found in '{INPUT_CSV_NAME}'.")
-        exit()
-    if MAX_COMPANIES_TO_PROCESS and MAX_COMPANIES_TO_PROCESS > 0 and MAX_COMPANIES_TO_PROCESS < len(df):
-        logging.info(f"Limiting processing to the first {MAX_COMPANIES_TO_PROCESS} companies.")
-        df = df.head(MAX_COMPANIES_TO_PROCESS)
-    else:
-        logging.info(f"Processing all {len(df)} companies.")
-    # <<<< End of new section >>>>
-
-    company_domains = []
-    company_email_contexts = []
-
-    # For testing with a subset:
-    # df = df.head(3) 
-    # logging.info(f"Processing {len(df)} companies (subset for testing).")
-
-    for index, row in df.iterrows():
-        company_name = str(row['Company Name']).strip()
-        if not company_name:
-            logging.warning(f"Skipping row {index+1} due to empty Company Name.")
-            company_domains.append("")
-            company_email_contexts.append("")
-            continue
-            
-        logging.info(f"\n--- Processing Company: {company_name} ({index + 1}/{len(df)}) ---")
-
-        domain, start_url = get_domain_from_google(company_name)
-        
-        if domain and start_url:
-            company_domains.append(domain)
-            contexts = scrape_site_for_email_context(start_url, domain)
-            company_email_contexts.append("; ".join(contexts) if contexts else "")
-        else:
-            company_domains.append("")
-            company_email_contexts.append("")
-            # logging.warning(f"Could not determine valid domain for {company_name} or no email contexts found.") # This log might be redundant if get_domain_from_google already logged
+    input_columns = list(pd.read_csv(input_csv_name, nrows=0).columns.str.strip())
+    name_column = next((column for column in COMPANY_NAME_COLUMNS if column in input_columns), None)
+    if name_column is None:
+        logging.error(f"None of the company name columns {COMPANY_NAME_COLUMNS} found in '{input_csv_name}'.")
+        return
+    if MAX_COMPANIES_TO_PROCESS and MAX_COMPANIES_TO_PROCESS > 0:
+        logging.info(f"Limiting processing to the first {MAX_COMPANIES_TO_PROCESS} matching companies.")
+    if sic_codes or locations:
+        logging.info(f"Only enriching companies matching SIC codes {list(sic_codes) or 'any'} and locations {list(locations) or 'any'}.")
+
+    completed_names = load_completed_company_names(output_csv_name, name_column) if resume else set()
+    if resume:
+        logging.info(f"Resuming: {len(completed_names)} companies already in '{output_csv_name}' will be skipped.")
+
+    # Rows are appended as they complete, so an interrupted run can be resumed with --resume.
+    value_columns = [column for column in input_columns if column not in ('company_domain', 'company_email')]
+    output_columns = value_columns + ['company_domain', 'company_email']
+    rows_written = 0
+    lookups_failed = 0
+
+    def iter_jobs():
+        """A CompanyJob for each matching input row, read chunk by chunk."""
+        matched = 0
+        name_position = value_columns.index(name_column)
+        for chunk in read_input_chunks(input_csv_name):
+            metrics.increment("input_rows", len(chunk))
+            chunk = filter_companies(chunk, sic_codes, locations).fillna("")
+            for values in chunk[value_columns].itertuples(index=False, name=None):
+                if MAX_COMPANIES_TO_PROCESS and MAX_COMPANIES_TO_PROCESS > 0 and matched >= MAX_COMPANIES_TO_PROCESS:
+                    return
+                position = matched
+                matched += 1
+                company_name = values[name_position].strip()
+                if company_name in completed_names:
+                    continue
+                yield CompanyJob(position, company_name, values)
+
+    # Companies are processed by a bounded worker pool with a bounded queue; results come back in input order.
+    # Network I/O runs on the worker threads and page parsing in PARSE_WORKERS processes; each
+    # thread waits for its own page's parse, which keeps the parse queue bounded by the thread count.
+    # Companies resolving to the same website share one crawl through domain_results, so each site is fetched once per run.
+    logging.info(f"Processing companies with up to {MAX_CONCURRENT_COMPANIES} concurrent worker(s) and {PARSE_WORKERS} parse process(es).")
+    domain_results.clear()
+    try:
+        with open_result_writer(output_csv_name, output_columns, append=resume) as result_writer:
+            with ParsePool(PARSE_WORKERS) as parse_pool, ThreadPoolExecutor(max_workers=max(1, MAX_CONCURRENT_COMPANIES)) as executor:
+                try:
+                    results = map_in_order(executor, lambda job: process_company(job.position, job.company_name, None, parse_pool),
+                                           iter_jobs(), max(1, MAX_COMPANIES_IN_FLIGHT))
+                    for job, result in results:
+                        if result is None:
+                            lookups_failed += 1
+                            continue
+                        result_writer.write_row(job.values + result.output_values())
+                        rows_written += 1
+                except KeyboardInterrupt:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logging.warning(f"Interrupted after {rows_written} companies. Run again with --resume to continue.")
+                    raise SystemExit(1)
+        logging.info(f"\nSuccessfully processed {rows_written} companies. Output saved to '{output_csv_name}'")
+        if lookups_failed:
+            logging.warning(f"{lookups_failed} companies were not written because their website lookup failed; run again with --resume to retry them.")
+    except OSError as e:
+        logging.error(f"Error saving output file: {e}")
+    finally:
+        domain_resolver.close()
+        logging.info(f"\n{metrics.summary()}")
+        if metrics_file:
+            metrics.write(metrics_file)
+            logging.info(f"Metrics written to '{metrics_file}'")
 
-    df['company_domain'] = company_domains
-    df['company_email'] = company_email_contexts
 
-    try:
-        df.to_csv(OUTPUT_CSV_NAME, index=False, encoding='utf-8')
-        logging.info(f"\nSuccessfully processed all companies. Output saved to '{OUTPUT_CSV_NAME}'")
-    except Exception as e:
-        logging.error(f"Error saving output CSV: {e}")
+# --- Main Script ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find each company's website and email addresses.")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Keep the companies already in '{OUTPUT_CSV_NAME}' and only process the missing ones")
+    parser.add_argument("--metrics-file", help="Also dump run metrics here (JSON, or Prometheus text if it ends in .prom)")
+    parser.add_argument("--input", default=INPUT_CSV_NAME, help=f"Input CSV (default: {INPUT_CSV_NAME})")
+    parser.add_argument("--output", default=OUTPUT_CSV_NAME,
+                        help=f"Output file (default: {OUTPUT_CSV_NAME}); a .parquet name writes Parquet instead of CSV (needs pyarrow)")
+    parser.add_argument("--sic", action="append", default=list(SIC_CODE_FILTER),
+                        help="Only enrich companies with this SIC code (repeatable)")
+    parser.add_argument("--location", action="append", default=list(LOCATION_FILTER),
+                        help="Only enrich companies whose address contains this town/postcode (repeatable)")
+    parser.add_argument("--offline", action="store_true",
+                        help=f"Re-run extraction from the pages cached in '{HTTP_CACHE_DIR}' (and cached domains) without any network access")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the on-disk page cache")
+    args = parser.parse_args()
+    if args.no_cache:
+        response_cache = None
+    elif args.offline:
+        response_cache.offline = True
+    enrich_companies_csv(args.input, args.output, resume=args.resume, metrics_file=args.metrics_file,
+                         sic_codes=args.sic, locations=args.location)
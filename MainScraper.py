@@ -1,11 +1,24 @@
+import argparse
 import csv
+import os
 import time
 import re
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By # Not explicitly used, but good to have if needed
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlparse, parse_qs
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Metrics import Metrics
+import BulkCompanyData
+import CompanyPageParser
+from ResponseCache import ResponseCache
+from ParsePool import ParsePool, default_parse_workers, map_in_order
+from RateLimiter import HostRateLimiter, THROTTLE_STATUS_CODES, retry_after_seconds
 
 # --- Configuration ---
 SEARCH_CRITERIA_TAG = "adv_manchester_sic28150_incorp_any_diss_any"
@@ -13,14 +26,33 @@ BASE_URL = "https://find-and-update.company-information.service.gov.uk"
 # This is your base search URL. Page numbers will be appended to this.
 SEARCH_URL_BASE = "https://find-and-update.company-information.service.gov.uk/advanced-search/get-results?companyNameIncludes=&companyNameExcludes=&registeredOfficeAddress=Manchester&incorporationFromDay=&incorporationFromMonth=&incorporationFromYear=&incorporationToDay=&incorporationToMonth=&incorporationToYear=&sicCodes=28150&dissolvedFromDay=&dissolvedFromMonth=&dissolvedFromYear=&dissolvedToDay=&dissolvedToMonth=&dissolvedToYear="
 MAX_COMPANIES = 104 # Adjust as needed
+DETAIL_FETCH_WORKERS = 3 # Workers fetching company pages in parallel (1 = fetch serially on the search worker)
+PARSE_WORKERS = default_parse_workers(DETAIL_FETCH_WORKERS) # Processes parsing company pages (0 = parse on the main thread)
+MAX_PAGES_IN_FLIGHT = 4 * DETAIL_FETCH_WORKERS # Company pages fetched or queued for parsing ahead of the CSV writer
+FETCH_BACKEND = "http" # "http" (pooled keep-alive sessions, browser only for CAPTCHAs) or "browser" (undetected Chrome for every page)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+REQUEST_TIMEOUT = 15 # seconds, HTTP backend only
+SEARCH_PAGE_LOAD_WAIT = 5 # seconds the browser waits at most for a search results page to finish loading
+COMPANY_PAGE_LOAD_WAIT = 3 # seconds the browser waits at most for a company page to finish loading
+COMPANIES_HOUSE_REQUESTS_PER_SECOND = 2 # Starting pace for Companies House, shared by all workers
+COMPANIES_HOUSE_MAX_REQUESTS_PER_SECOND = 5 # Fastest pace reached while Companies House stays healthy
+MAX_THROTTLE_RETRIES = 3 # Retries of a page answered with 429/503, each after the rate limiter's cool-down
+HTTP_CACHE_DIR = 'http_cache' # On-disk cache of fetched pages, revalidated with ETag/Last-Modified (HTTP backend, shared with EmailScraper.py)
 OUTPUT_CSV_FILE = f"companies_house_{SEARCH_CRITERIA_TAG.replace(' ','_')}.csv"
+OUTPUT_FIELDNAMES = ["Company Name", "Companies House Link", "Location", "SIC Description", "SIC Found Method", "Email Address"]
 
 # --- Helper Functions ---
+captcha_lock = threading.Lock()
+# Token bucket per host: halves the pace on 429/503/CAPTCHA and speeds back up while pages come back normally.
+rate_limiter = HostRateLimiter(COMPANIES_HOUSE_REQUESTS_PER_SECOND, COMPANIES_HOUSE_MAX_REQUESTS_PER_SECOND,
+                               burst=max(1, DETAIL_FETCH_WORKERS))
+metrics = Metrics("companies_house_scraper") # Per-stage counters and latency histograms for this run
+
 def setup_driver():
     chrome_options = Options()
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
     # chrome_options.add_argument("--headless")
     try:
         print("Attempting to launch undetected-chromedriver...")
@@ -37,193 +69,384 @@ def extract_email_from_text(text):
     match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
     return match.group(0) if match else "Not found"
 
-# --- Main Scraping Logic ---
-def scrape_companies_house():
-    driver = setup_driver()
-    companies_data = []
+def is_captcha_page(page_content):
+    lowered = page_content.lower()
+    return "prove you are not a robot" in lowered or "enter characters" in lowered
+
+def wait_for_rate_limit(host):
+    waited = rate_limiter.acquire(host)
+    if waited:
+        metrics.observe("politeness_wait", waited)
+
+def report_throttled(host, reason, retry_after=None):
+    metrics.increment("throttled_responses")
+    rate_limiter.report_throttled(host, retry_after)
+    print(f"{host} answered with {reason}. Slowing down to {rate_limiter.current_rate(host):.2f} requests/s.")
+
+def wait_for_page_ready(driver, wait_seconds):
+    """Waits until the document has finished loading, for at most wait_seconds."""
+    try:
+        WebDriverWait(driver, wait_seconds).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    except TimeoutException:
+        pass # Use whatever has rendered so far, as the fixed wait used to
+
+def load_page(driver, url, wait_seconds, captcha_message, captcha_prompt):
+    """Loads url in the driver and returns its page source, pausing for a manual CAPTCHA solve if needed."""
+    host = urlparse(url).netloc
+    wait_for_rate_limit(host)
+    with metrics.timer("driver_get"):
+        driver.get(url)
+    with metrics.timer("page_load_wait"):
+        wait_for_page_ready(driver, wait_seconds)
+    page_content = driver.page_source
+    if not is_captcha_page(page_content):
+        rate_limiter.report_success(host)
+    else:
+        metrics.increment("captchas_in_browser")
+        report_throttled(host, "a CAPTCHA")
+        with captcha_lock: # Only one browser window asks the user for help at a time
+            print(captcha_message)
+            input(captcha_prompt)
+            page_content = driver.page_source # Re-fetch after solving
+    return page_content
+
+class BrowserFetcher:
+    """Loads every page through undetected Chrome. Each thread gets its own browser;
+       launches are serialised because undetected-chromedriver patches its driver binary on startup.
+       A browser given up with release_driver() is reused by the next thread that needs one."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._drivers = []
+        self._idle_drivers = []
+        self._setup_lock = threading.Lock()
+
+    def get_driver(self):
+        if getattr(self._local, 'driver', None) is None:
+            with self._setup_lock:
+                if self._idle_drivers:
+                    self._local.driver = self._idle_drivers.pop()
+                else:
+                    self._local.driver = setup_driver()
+                    self._drivers.append(self._local.driver)
+        return self._local.driver
+
+    def release_driver(self):
+        """Hands this thread's browser, if it has one, to the next thread that calls get_driver()."""
+        driver = getattr(self._local, 'driver', None)
+        if driver is not None:
+            self._local.driver = None
+            with self._setup_lock:
+                self._idle_drivers.append(driver)
+
+    def fetch(self, url, wait_seconds, captcha_message, captcha_prompt):
+        return load_page(self.get_driver(), url, wait_seconds, captcha_message, captcha_prompt)
+
+    def close(self):
+        if self._drivers:
+            print("Closing browser...")
+        for driver in self._drivers:
+            driver.quit()
+        self._drivers = []
+        self._idle_drivers = []
+
+class HttpFetcher:
+    """Fetches the server-rendered Companies House pages over pooled keep-alive HTTP sessions.
+       A browser is only launched, lazily, when a response turns out to be a CAPTCHA page.
+       With a response_cache, pages are revalidated instead of refetched, or replayed if it is offline."""
+
+    def __init__(self, response_cache=None):
+        self._local = threading.local()
+        self._browser = BrowserFetcher()
+        self.response_cache = response_cache
+
+    def get_session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'User-Agent': USER_AGENT})
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, DETAIL_FETCH_WORKERS))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url):
+        if self.response_cache is None:
+            return self.get_session().get(url, timeout=REQUEST_TIMEOUT)
+        response = self.response_cache.get(self.get_session(), url, timeout=REQUEST_TIMEOUT)
+        metrics.increment(f"http_cache_{response.cache_status}")
+        return response
+
+    def fetch(self, url, wait_seconds, captcha_message, captcha_prompt):
+        if self.response_cache is not None and self.response_cache.offline:
+            return self.get(url).text # Raises OfflineCacheMiss for pages that were never fetched
+        host = urlparse(url).netloc
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            wait_for_rate_limit(host)
+            with metrics.timer("http_fetch"):
+                response = self.get(url)
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                break
+            report_throttled(host, f"HTTP {response.status_code}", retry_after_seconds(response.headers))
+        response.raise_for_status()
+        page_content = response.text
+        if not is_captcha_page(page_content):
+            rate_limiter.report_success(host)
+        else:
+            report_throttled(host, "a CAPTCHA")
+            if self.response_cache is not None:
+                self.response_cache.discard(url)
+            metrics.increment("browser_fallbacks")
+            print(f"CAPTCHA served to the HTTP backend for {url}. Falling back to the browser.")
+            page_content = self._browser.fetch(url, wait_seconds, captcha_message, captcha_prompt)
+        return page_content
+
+    def release_driver(self):
+        self._browser.release_driver()
+
+    def close(self):
+        self._browser.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+def create_fetcher(backend, cache_mode="revalidate"):
+    """cache_mode: "revalidate" (use the on-disk page cache), "offline" (replay it only) or "off"."""
+    if cache_mode == "offline" or backend == "http":
+        return HttpFetcher(None if cache_mode == "off" else ResponseCache(HTTP_CACHE_DIR, offline=cache_mode == "offline"))
+    if backend == "browser":
+        return BrowserFetcher()
+    raise ValueError(f"Unknown fetch backend: {backend!r} (expected 'http' or 'browser')")
+
+def collect_company_links(fetcher):
+    """Walks the paginated search results and returns up to MAX_COMPANIES (company_name, company_ch_link, page_number) tuples."""
+    company_links = []
     processed_company_links = set()
+    page_number = 1 # Start with page 1
+
+    while len(company_links) < MAX_COMPANIES:
+        current_url = SEARCH_URL_BASE
+        if page_number > 1:
+            # Append page number for subsequent pages.
+            # SEARCH_URL_BASE already has query params, so we use '&'
+            current_url = f"{SEARCH_URL_BASE}&page={page_number}"
+
+        print(f"\nFetching search results (Page {page_number}): {current_url}")
+        page_content = fetcher.fetch(current_url, SEARCH_PAGE_LOAD_WAIT,
+                                     f"CAPTCHA detected on search page {page_number}. Please solve manually in the browser.",
+                                     "Press Enter in this console after solving CAPTCHA to continue...")
+        # For debugging specific pages:
+        # with open(f"debug_search_page_{page_number}.html", "w", encoding="utf-8") as f:
+        #     f.write(page_content)
+        with metrics.timer("search_page_parse"):
+            search_page = CompanyPageParser.parse_search_page(page_content)
+        metrics.increment("search_pages")
+
+        if not search_page.results:
+            if search_page.no_companies_found and page_number == 1: # "0 companies found" is most relevant on the first query
+                print(f"No companies found for the specified advanced search criteria (0 companies found message on first page).")
+            else: # For page_number > 1, or if no "0 companies" message, assume end of results
+                print(f"No search result items extracted on page {page_number}. Assuming end of paginated results.")
+            break # Break from the main while loop (no more items on this page or subsequent pages)
+
+        new_companies_found_on_this_page = False
+        for company_name, company_ch_link_relative in search_page.results:
+            if len(company_links) >= MAX_COMPANIES:
+                break # Max companies reached
+
+            company_ch_link = urljoin(BASE_URL, company_ch_link_relative) # Join with site's BASE_URL
+
+            if company_ch_link in processed_company_links:
+                continue # Skip if already processed
+
+            processed_company_links.add(company_ch_link)
+            new_companies_found_on_this_page = True
+            company_links.append((company_name, company_ch_link, page_number))
+
+        print(f"--- Collected {len(company_links)}/{MAX_COMPANIES} company links ---")
+
+        # After processing all items on the current page
+        if len(company_links) >= MAX_COMPANIES:
+            print(f"Reached MAX_COMPANIES limit of {MAX_COMPANIES}.")
+            break # Break from the main while loop
+
+        if not new_companies_found_on_this_page:
+            # This means the page had items, but all were duplicates of ones already processed.
+            # This isn't an error, just informational. We'll proceed to the next page.
+            print(f"Info: No *new* companies found on page {page_number} (all items were already processed).")
+
+        page_number += 1 # Increment to go to the next page (paced by rate_limiter)
+
+    return company_links
+
+# --- Main Scraping Logic ---
+def load_completed_links():
+    """Returns the Companies House links already present in OUTPUT_CSV_FILE from an earlier run."""
+    if not os.path.exists(OUTPUT_CSV_FILE):
+        return set()
+    with open(OUTPUT_CSV_FILE, newline='', encoding='utf-8') as existing_file:
+        return {row["Companies House Link"] for row in csv.DictReader(existing_file) if row.get("Companies House Link")}
+
+def scrape_companies_house(backend=FETCH_BACKEND, resume=False, metrics_file=None, cache_mode="revalidate"):
+    """Scrapes the search results into OUTPUT_CSV_FILE, then prints a per-stage timing summary and,
+       if metrics_file is given, dumps the metrics there (JSON, or Prometheus text for *.prom).
+       cache_mode "offline" re-runs the extraction from pages cached by an earlier HTTP-backend run."""
+    fetcher = create_fetcher(backend, cache_mode)
+    parse_pool = ParsePool(PARSE_WORKERS) # Started before any fetch threads exist
+    rows_written = 0
+    pages_not_fetched = 0
+
+    def fetch_company_page(company_link):
+        """Fetches one company page and queues it for parsing. Returns the parse Future, or None if the
+           page cannot be fetched (404/410/5xx, connection error, still throttled after the retries):
+           that company is logged and left out of the CSV, so one bad company does not stop the run
+           and --resume fetches it again."""
+        company_name, company_ch_link, page_number = company_link
+        try:
+            company_page_content = fetcher.fetch(company_ch_link, COMPANY_PAGE_LOAD_WAIT,
+                                                 f"CAPTCHA detected on company page: {company_name}. Please solve manually.",
+                                                 "Press Enter after solving CAPTCHA to continue...")
+        except requests.exceptions.RequestException as e:
+            metrics.increment("company_page_errors")
+            print(f"Could not fetch the company page of {company_name} ({company_ch_link}): {e}")
+            return None
+        return parse_pool.submit(CompanyPageParser.parse_company_page, company_page_content)
 
     print(f"Starting scrape using base advanced search URL: {SEARCH_URL_BASE}")
     print(f"Output will be saved to: {OUTPUT_CSV_FILE}")
+    print(f"Fetch backend: {'offline replay from ' + HTTP_CACHE_DIR if cache_mode == 'offline' else backend}, parse processes: {PARSE_WORKERS or 'none (main thread)'}")
 
-    page_number = 1 # Start with page 1
+    completed_links = load_completed_links() if resume else set()
+    if resume:
+        print(f"Resuming: {len(completed_links)} companies already in {OUTPUT_CSV_FILE} will be skipped.")
+
+    # Each company is appended and flushed as soon as it is parsed, so an interrupted run keeps its progress.
+    write_header = not (resume and os.path.exists(OUTPUT_CSV_FILE) and os.path.getsize(OUTPUT_CSV_FILE) > 0)
+    output_file = open(OUTPUT_CSV_FILE, 'a' if resume else 'w', newline='', encoding='utf-8')
+    dict_writer = csv.DictWriter(output_file, fieldnames=OUTPUT_FIELDNAMES)
+    if write_header:
+        dict_writer.writeheader()
+        output_file.flush()
 
     try:
-        while len(companies_data) < MAX_COMPANIES:
-            current_url = SEARCH_URL_BASE
-            if page_number > 1:
-                # Append page number for subsequent pages.
-                # SEARCH_URL_BASE already has query params, so we use '&'
-                current_url = f"{SEARCH_URL_BASE}&page={page_number}"
-
-            print(f"\nFetching search results (Page {page_number}): {current_url}")
-            driver.get(current_url)
-            time.sleep(5) # Allow page to load fully
-
-            page_content = driver.page_source
-            # For debugging specific pages:
-            # with open(f"debug_search_page_{page_number}.html", "w", encoding="utf-8") as f:
-            #     f.write(page_content)
-            soup = BeautifulSoup(page_content, 'html.parser')
-
-            if "prove you are not a robot" in page_content.lower() or "enter characters" in page_content.lower():
-                print(f"CAPTCHA detected on search page {page_number}. Please solve manually in the browser.")
-                input("Press Enter in this console after solving CAPTCHA to continue...")
-                page_content = driver.page_source # Re-fetch after solving
-                soup = BeautifulSoup(page_content, 'html.parser')
-
-            search_result_items = []
-            # --- Primary attempt: Table structure ---
-            search_results_table = soup.find('table', class_='govuk-table')
-            if search_results_table and search_results_table.find('tbody'):
-                # print(f"DEBUG: Page {page_number}: Found results table with 'govuk-table' class and 'tbody'.")
-                candidate_cells = search_results_table.select('tbody > tr > td.govuk-table__cell')
-                for cell in candidate_cells:
-                    if cell.select_one('h2.govuk-heading-m > a.govuk-link[href^="/company/"]'):
-                        search_result_items.append(cell)
-                # print(f"DEBUG: Page {page_number}: Extracted {len(search_result_items)} items from table cells.")
-            else:
-                # --- Fallback: List structure ---
-                # print(f"Warning: Page {page_number}: Primary table structure not found. Falling back to list-based selectors.")
-                search_result_items = soup.select('ul#results-list > li')
-                # if search_result_items:
-                    # print(f"DEBUG: Page {page_number}: Found {len(search_result_items)} items using fallback list selector.")
-
-            if not search_result_items:
-                no_results_h1 = soup.find('h1', string=re.compile(r"\s*0\s+companies found", re.IGNORECASE))
-                if no_results_h1 and page_number == 1: # "0 companies found" is most relevant on the first query
-                    print(f"No companies found for the specified advanced search criteria (0 companies found message on first page).")
-                else: # For page_number > 1, or if no "0 companies" message, assume end of results
-                    print(f"No search result items extracted on page {page_number}. Assuming end of paginated results.")
-                break # Break from the main while loop (no more items on this page or subsequent pages)
-
-            new_companies_found_on_this_page = False
-            for item_container in search_result_items: # item_container is a <td> (primary) or <li> (fallback)
-                if len(companies_data) >= MAX_COMPANIES:
-                    break # Max companies reached
-
-                link_element = item_container.select_one('h2.govuk-heading-m > a.govuk-link[href^="/company/"]')
-                if not link_element:
-                    continue
-                
-                company_name = "Not found"
-                temp_link_soup_outer = BeautifulSoup(str(link_element), 'html.parser')
-                actual_link_tag = temp_link_soup_outer.find('a')
-                if actual_link_tag:
-                    for hidden_span in actual_link_tag.select('span.govuk-visually-hidden'):
-                        hidden_span.decompose()
-                    company_name = actual_link_tag.get_text(strip=True)
+        company_links = collect_company_links(fetcher)
+        if DETAIL_FETCH_WORKERS > 1:
+            fetcher.release_driver() # The search pages' browser becomes the first fetch worker's, not a fourth one left idle
+        pending_links = [link for link in company_links if link[1] not in completed_links]
+
+        print(f"\nFetching {len(pending_links)} company pages with {max(1, DETAIL_FETCH_WORKERS)} worker(s)...")
+        with ThreadPoolExecutor(max_workers=max(1, DETAIL_FETCH_WORKERS)) as executor:
+            try:
+                # Fetch threads hand pages to the parse processes; results come back in link order, so the
+                # CSV keeps the search-result ordering. At most MAX_PAGES_IN_FLIGHT pages are held at once.
+                if DETAIL_FETCH_WORKERS > 1:
+                    parsed_pages = map_in_order(executor, fetch_company_page, pending_links, max(1, MAX_PAGES_IN_FLIGHT))
                 else:
-                    company_name = link_element.get_text(strip=True).replace("(link opens a new window)", "").strip()
-
-                company_ch_link_relative = link_element.get('href')
-                company_ch_link = urljoin(BASE_URL, company_ch_link_relative) # Join with site's BASE_URL
-
-                if company_ch_link in processed_company_links:
-                    continue # Skip if already processed
-
-                processed_company_links.add(company_ch_link)
-                new_companies_found_on_this_page = True
-
-                print(f"Processing ({len(companies_data) + 1}/{MAX_COMPANIES}): {company_name} ({company_ch_link}) from page {page_number}")
-
-                driver.get(company_ch_link)
-                time.sleep(3)
-                company_page_content = driver.page_source
-                company_soup = BeautifulSoup(company_page_content, 'html.parser')
-
-                if "prove you are not a robot" in company_page_content.lower() or "enter characters" in company_page_content.lower():
-                    print(f"CAPTCHA detected on company page: {company_name}. Please solve manually.")
-                    input("Press Enter after solving CAPTCHA to continue...")
-                    company_page_content = driver.page_source
-                    company_soup = BeautifulSoup(company_page_content, 'html.parser')
-
-                location = "Not found"
-                location_dt = company_soup.find('dt', string=re.compile(r"Registered office address", re.IGNORECASE))
-                if location_dt:
-                    location_dd = location_dt.find_next_sibling('dd')
-                    if location_dd:
-                        location_parts = [part.strip() for part in location_dd.get_text(separator='\n').split('\n') if part.strip()]
-                        location = ", ".join(location_parts)
-
-                sic_description_parts = []
-                sic_found_method = "None"
-                sic_section_label = company_soup.find(['h2', 'h3', 'dt'], string=re.compile(r"Nature of business \(SIC\)", re.IGNORECASE))
-                if sic_section_label:
-                    ul_element = None; current_element = sic_section_label
-                    for _ in range(3):
-                        next_sibling = current_element.find_next_sibling()
-                        if not next_sibling: break
-                        if next_sibling.name == 'ul': ul_element = next_sibling; break
-                        if next_sibling.name == 'dd' and next_sibling.find('ul'): ul_element = next_sibling.find('ul'); break
-                        if next_sibling.name == 'div' and next_sibling.find('ul'): ul_element = next_sibling.find('ul'); break
-                        current_element = next_sibling
-                    if not ul_element and sic_section_label.parent: ul_element = sic_section_label.parent.find('ul')
-                    if ul_element:
-                        span_tags_in_ul = ul_element.select('li > span[id^="sic"], li span[id^="sic"]')
-                        if span_tags_in_ul:
-                            for span_tag in span_tags_in_ul:
-                                text = span_tag.get_text(strip=True)
-                                if text and re.match(r"^\d{5}\s*-", text): sic_description_parts.append(text)
-                            if sic_description_parts: sic_found_method = "Label->UL/DD->LI->SPAN[id^=sic]"
-                        else: 
-                            list_items = ul_element.find_all('li', recursive=False)
-                            for li_item in list_items:
-                                text = li_item.get_text(strip=True)
-                                if text and re.match(r"^\d{5}\s*-", text): sic_description_parts.append(text)
-                            if sic_description_parts: sic_found_method = "Label->UL/DD->LI Text"
-                unique_sics = list(dict.fromkeys([s.strip() for s in sic_description_parts if s.strip()])) if sic_description_parts else []
-                sic_description = " | ".join(unique_sics) if unique_sics else "Not found"
-                
-                email_address = "Not found" # Email scraping is usually more involved
-
-                companies_data.append({
-                    "Company Name": company_name, "Companies House Link": company_ch_link,
-                    "Location": location, "Email Address": email_address,
-                    "SIC Description": sic_description, "SIC Found Method": sic_found_method
-                })
-                print(f"  Location: {location}")
-                print(f"  SIC: {sic_description} (Method: {sic_found_method})")
-                print(f"  Email: {email_address}")
-                print(f"--- Collected {len(companies_data)}/{MAX_COMPANIES} companies ---")
-
-            # After processing all items on the current page
-            if len(companies_data) >= MAX_COMPANIES:
-                print(f"Reached MAX_COMPANIES limit of {MAX_COMPANIES}.")
-                break # Break from the main while loop
-
-            if not new_companies_found_on_this_page and search_result_items:
-                # This means the page had items, but all were duplicates of ones already processed.
-                # This isn't an error, just informational. We'll proceed to the next page.
-                print(f"Info: No *new* companies found on page {page_number} (all items were already processed).")
-
-            page_number += 1 # Increment to go to the next page
-            time.sleep(2) # Small pause before fetching the next page
+                    parsed_pages = ((link, fetch_company_page(link)) for link in pending_links)
+                for (company_name, company_ch_link, page_number), parse_future in parsed_pages:
+                    if parse_future is None:
+                        pages_not_fetched += 1
+                        continue
+                    print(f"Processing ({rows_written + 1}/{len(pending_links)}): {company_name} ({company_ch_link}) from page {page_number}")
+
+                    (location, sic_description, sic_found_method), parse_seconds = parse_future.result()
+                    metrics.observe("company_page_parse", parse_seconds)
+                    metrics.increment("sic_found" if sic_description != "Not found" else "sic_not_found")
+                    
+                    email_address = "Not found" # Email scraping is usually more involved
+
+                    dict_writer.writerow({
+                        "Company Name": company_name, "Companies House Link": company_ch_link,
+                        "Location": location, "Email Address": email_address,
+                        "SIC Description": sic_description, "SIC Found Method": sic_found_method
+                    })
+                    output_file.flush()
+                    rows_written += 1
+                    metrics.increment("companies_written")
+                    print(f"  Location: {location}")
+                    print(f"  SIC: {sic_description} (Method: {sic_found_method})")
+                    print(f"  Email: {email_address}")
+                    print(f"--- Collected {len(completed_links) + rows_written}/{MAX_COMPANIES} companies ---")
+            except KeyboardInterrupt:
+                executor.shutdown(wait=False, cancel_futures=True)
+                print(f"\nInterrupted. Run again with --resume to continue from company {len(completed_links) + rows_written + 1}.")
 
     except Exception as e:
         print(f"A critical error occurred: {e}")
         import traceback
         traceback.print_exc()
     finally:
-        if 'driver' in locals() and driver:
-            print("Closing browser...")
-            driver.quit()
+        fetcher.close()
+        parse_pool.close()
+        output_file.close()
 
-    if companies_data:
-        print(f"\nWriting {len(companies_data)} companies to {OUTPUT_CSV_FILE}...")
-        all_keys = set().union(*(d.keys() for d in companies_data))
-        preferred_order = ["Company Name", "Companies House Link", "Location", "SIC Description", "SIC Found Method", "Email Address"]
-        fieldnames = [k for k in preferred_order if k in all_keys] + sorted([k for k in all_keys if k not in preferred_order])
-        
-        with open(OUTPUT_CSV_FILE, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, fieldnames=fieldnames)
-            dict_writer.writeheader()
-            dict_writer.writerows(companies_data)
-        print(f"Data successfully written to {OUTPUT_CSV_FILE}")
+    if rows_written:
+        print(f"\nData successfully written to {OUTPUT_CSV_FILE} ({rows_written} new companies).")
+    elif completed_links:
+        print(f"No new companies to add; {OUTPUT_CSV_FILE} already holds {len(completed_links)}.")
     else:
         print("No data collected or an error occurred before data collection.")
+    if pages_not_fetched:
+        print(f"{pages_not_fetched} company page(s) could not be fetched and were not written; run again with --resume to retry them.")
+
+    print(f"\n{metrics.summary()}")
+    if metrics_file:
+        metrics.write(metrics_file)
+        print(f"Metrics written to {metrics_file}")
+
+def search_criteria_from_url(search_url):
+    """(location, sic_codes) of an advanced search URL, e.g. ('Manchester', ['28150']) for SEARCH_URL_BASE."""
+    query = parse_qs(urlparse(search_url).query)
+    location = query.get("registeredOfficeAddress", [""])[0].strip()
+    sic_codes = [code.strip() for value in query.get("sicCodes", []) for code in value.split(",") if code.strip()]
+    return location, sic_codes
+
+def export_from_bulk_data(bulk_db=BulkCompanyData.BULK_DB_FILE, resume=False):
+    """Answers the SEARCH_URL_BASE query from a local Basic Company Data database (see BulkCompanyData.py)
+       and writes the same OUTPUT_CSV_FILE as scrape_companies_house, without loading a single page."""
+    location, sic_codes = search_criteria_from_url(SEARCH_URL_BASE)
+    print(f"Querying {bulk_db} for location={location or 'any'}, SIC codes={sic_codes or 'any'}")
+    started = time.perf_counter()
+    companies = BulkCompanyData.search_companies(bulk_db, sic_codes, location, MAX_COMPANIES)
+    print(f"{len(companies)} companies found in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    completed_links = load_completed_links() if resume else set()
+    write_header = not (resume and os.path.exists(OUTPUT_CSV_FILE) and os.path.getsize(OUTPUT_CSV_FILE) > 0)
+    rows_written = 0
+    with open(OUTPUT_CSV_FILE, 'a' if resume else 'w', newline='', encoding='utf-8') as output_file:
+        dict_writer = csv.DictWriter(output_file, fieldnames=OUTPUT_FIELDNAMES)
+        if write_header:
+            dict_writer.writeheader()
+        for company in companies:
+            company_ch_link = f"{BASE_URL}/company/{company['company_number']}"
+            if company_ch_link in completed_links:
+                continue
+            dict_writer.writerow({
+                "Company Name": company["company_name"], "Companies House Link": company_ch_link,
+                "Location": BulkCompanyData.format_address(company), "Email Address": "Not found",
+                "SIC Description": BulkCompanyData.format_sic_description(company), "SIC Found Method": "bulk data"
+            })
+            rows_written += 1
+    print(f"Data successfully written to {OUTPUT_CSV_FILE} ({rows_written} new companies).")
 
 if __name__ == "__main__":
     print("Reminder: Close any existing Google Chrome windows for best results with undetected_chromedriver.")
     # input("Press Enter to start scraping after closing Chrome instances...")
-    scrape_companies_house()
+    parser = argparse.ArgumentParser(description="Scrape Companies House advanced search results into a CSV.")
+    parser.add_argument("--backend", choices=["http", "browser"], default=FETCH_BACKEND,
+                        help=f"How pages are fetched (default: {FETCH_BACKEND})")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Keep the companies already in {OUTPUT_CSV_FILE} and only fetch the missing ones")
+    parser.add_argument("--metrics-file", help="Also dump run metrics here (JSON, or Prometheus text if it ends in .prom)")
+    parser.add_argument("--bulk-db", nargs="?", const=BulkCompanyData.BULK_DB_FILE,
+                        help="Answer the search from a local Basic Company Data database instead of fetching pages "
+                             f"(default path: {BulkCompanyData.BULK_DB_FILE}; build it with BulkCompanyData.py)")
+    parser.add_argument("--offline", action="store_true",
+                        help=f"Re-run the extraction from the pages cached in '{HTTP_CACHE_DIR}' without any network access")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the on-disk page cache")
+    args = parser.parse_args()
+    if args.bulk_db:
+        export_from_bulk_data(args.bulk_db, resume=args.resume)
+    else:
+        cache_mode = "off" if args.no_cache else "offline" if args.offline else "revalidate"
+        scrape_companies_house(backend=args.backend, resume=args.resume, metrics_file=args.metrics_file, cache_mode=cache_mode)
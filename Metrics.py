@@ -0,0 +1,132 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram: constant memory however many observations it sees."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for position, upper_bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= upper_bound:
+                self.bucket_counts[position] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, fraction):
+        """Estimated quantile: the upper bound of the bucket holding it, capped at the largest value seen."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for upper_bound, bucket_count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(upper_bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Thread-safe counters and per-stage latency histograms for one scraper run."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Times the enclosed block as one observation of `stage`; failures also count as `<stage>_errors`."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f"{stage}_errors")
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "run_seconds": round(time.time() - self.started_at, 3),
+                "counters": dict(sorted(self.counters.items())),
+                "stages": {
+                    stage: {
+                        "count": histogram.count,
+                        "total_seconds": round(histogram.total, 6),
+                        "mean_seconds": round(histogram.total / histogram.count, 6) if histogram.count else 0.0,
+                        "p50_seconds": histogram.quantile(0.50),
+                        "p99_seconds": histogram.quantile(0.99),
+                        "max_seconds": round(histogram.max, 6),
+                    }
+                    for stage, histogram in sorted(self.histograms.items())
+                },
+            }
+
+    def summary(self):
+        """Human-readable end-of-run report: time spent per stage, then counters."""
+        data = self.as_dict()
+        lines = [f"Run time {data['run_seconds']:.1f}s. Time per stage (p50/p99 are bucket estimates):"]
+        lines.append(f"  {'stage':<22}{'count':>8}{'total s':>11}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for stage, stats in sorted(data["stages"].items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append(
+                f"  {stage:<22}{stats['count']:>8}{stats['total_seconds']:>11.2f}{stats['mean_seconds'] * 1000:>10.1f}"
+                f"{stats['p50_seconds'] * 1000:>10.1f}{stats['p99_seconds'] * 1000:>10.1f}{stats['max_seconds'] * 1000:>10.1f}"
+            )
+        if data["counters"]:
+            lines.append("  Counters: " + ", ".join(f"{name}={value}" for name, value in data["counters"].items()))
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            metric = f"{self.prefix}_stage_seconds"
+            if self.histograms:
+                lines.append(f"# TYPE {metric} histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for upper_bound, bucket_count in zip(LATENCY_BUCKETS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if upper_bound == math.inf else repr(float(upper_bound))
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dumps the metrics to path: Prometheus text for *.prom / *.txt, JSON otherwise."""
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            if path.endswith((".prom", ".txt")):
+                metrics_file.write(self.to_prometheus())
+            else:
+                json.dump(self.as_dict(), metrics_file, indent=2)
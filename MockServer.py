@@ -0,0 +1,183 @@
+import hashlib
+import json
+import re
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# --- Configuration ---
+MOCK_COMPANY_COUNT = 200
+RESULTS_PER_SEARCH_PAGE = 20
+NO_WEBSITE_EVERY = 7 # Every Nth company has no website, so Google lookups also come back empty
+EMAIL_ON_HOMEPAGE_EVERY = 3 # Every Nth website shows its email on the homepage instead of the contact page
+HOMEPAGE_FILLER_PARAGRAPHS = 150 # Roughly 15 KB of text per homepage
+
+SIC_DESCRIPTIONS = [
+    "28150 - Manufacture of bearings, gears, gearing and driving elements",
+    "25620 - Machining",
+    "33120 - Repair of machinery",
+]
+FILLER_PARAGRAPH = "<p>We design and manufacture precision components for industry across the North West.</p>"
+
+
+# --- Fixtures ---
+# Synthetic pages that follow the structure of the real Companies House and company websites
+# closely enough to exercise every selector the scrapers use.
+
+def company_number(index):
+    return f"{index:08d}"
+
+
+def company_name(index):
+    return f"MOCK ENGINEERING {index} LIMITED"
+
+
+def company_index_from_name(name):
+    match = re.search(r"MOCK ENGINEERING (\d+)", name, re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def has_website(index):
+    return index % NO_WEBSITE_EVERY != 0
+
+
+def render_search_page(page_number, company_count):
+    """Search results page. Odd pages use the govuk-table layout and even pages the ul#results-list one."""
+    first = (page_number - 1) * RESULTS_PER_SEARCH_PAGE + 1
+    indexes = range(first, min(first + RESULTS_PER_SEARCH_PAGE, company_count + 1))
+    if not indexes:
+        return "<html><body><h1>0 companies found</h1></body></html>" if page_number == 1 else "<html><body><p>No results</p></body></html>"
+    links = [
+        f'<h2 class="govuk-heading-m"><a class="govuk-link" href="/company/{company_number(i)}" target="_blank">'
+        f'{company_name(i)}<span class="govuk-visually-hidden">(link opens a new window)</span></a></h2>'
+        f'<p>{company_number(i)} - Incorporated on 1 January 2001</p>'
+        for i in indexes
+    ]
+    if page_number % 2:
+        rows = "".join(f'<tr class="govuk-table__row"><td class="govuk-table__cell">{link}</td></tr>' for link in links)
+        results = f'<table class="govuk-table"><tbody class="govuk-table__body">{rows}</tbody></table>'
+    else:
+        results = '<ul id="results-list">' + "".join(f"<li>{link}</li>" for link in links) + "</ul>"
+    return f"<html><body><h1>{company_count} companies found</h1>{results}</body></html>"
+
+
+def render_company_page(index):
+    """Company overview page. Alternates between the h2+ul and dt+dd>ul SIC layouts."""
+    address = f'<dl><dt>Registered office address</dt><dd class="text data" id="company-address">\n  Unit {index}, Mill Lane\n  Manchester\n  M{index % 40} 1AA\n</dd></dl>'
+    sics = SIC_DESCRIPTIONS[: 1 + index % len(SIC_DESCRIPTIONS)]
+    if index % 2:
+        items = "".join(f'<li><span id="sic{n}">{sic}</span></li>' for n, sic in enumerate(sics))
+        sic_block = f'<h2 class="heading-medium">Nature of business (SIC)</h2><ul>{items}</ul>'
+    else:
+        items = "".join(f"<li>{sic}</li>" for sic in sics)
+        sic_block = f"<dl><dt>Nature of business (SIC)</dt><dd><ul>{items}</ul></dd></dl>"
+    return f"<html><head><title>{company_name(index)}</title></head><body>{address}{sic_block}</body></html>"
+
+
+def render_site_page(index, page):
+    """Company website pages: a homepage with cookie/blog/contact links and a contact page."""
+    email = f"info@mock{index}.co.uk"
+    nav = (f'<a href="/site/{index}/cookies">Cookie policy</a> <a href="/site/{index}/blog">Blog</a> '
+           f'<a href="/site/{index}/brochure.pdf">Brochure</a> <a href="/site/{index}/contact">Contact us</a>')
+    if page == "":
+        contact = f"<p>Email: {email}</p>" if index % EMAIL_ON_HOMEPAGE_EVERY == 0 else ""
+        body = f"<nav>{nav}</nav>{FILLER_PARAGRAPH * HOMEPAGE_FILLER_PARAGRAPHS}{contact}"
+    elif page == "contact":
+        body = f"<nav>{nav}</nav><h1>Contact</h1><p>Call 0161 000 {index:04d} or email {email}.</p>"
+    else:
+        body = f"<nav>{nav}</nav><h1>{page.title()}</h1>{FILLER_PARAGRAPH * 10}"
+    return f"<html><head><title>Mock Engineering {index}</title></head><body>{body}</body></html>"
+
+
+def fake_google_search(base_url):
+    """Returns a stand-in for googlesearch.search that answers from the mock websites. Each answer
+       starts with a Companies House result so the scraper's filtering is exercised too."""
+    def search(query, num_results=10, lang="en", **kwargs):
+        index = company_index_from_name(query)
+        results = [f"https://find-and-update.company-information.service.gov.uk/company/{company_number(index or 0)}"]
+        if index is not None and has_website(index):
+            results.append(f"{base_url}/site/{index}/")
+        return iter(results[:num_results])
+    return search
+
+
+# --- Server ---
+class MockRequestHandler(BaseHTTPRequestHandler):
+    company_count = MOCK_COMPANY_COUNT
+    pages_served = None # multiprocessing.Value shared with the parent process
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        status, content_type, body = 200, "text/html; charset=utf-8", None
+        site_match = re.match(r"^/site/(\d+)/(.*)$", url.path)
+        company_match = re.match(r"^/company/(\d{8})$", url.path)
+
+        if url.path == "/__stats":
+            content_type = "application/json"
+            body = json.dumps({"pages_served": self.pages_served.value})
+        elif url.path == "/advanced-search/get-results":
+            page_number = int(parse_qs(url.query).get("page", ["1"])[0])
+            body = render_search_page(page_number, self.company_count)
+        elif company_match and 1 <= int(company_match.group(1)) <= self.company_count:
+            body = render_company_page(int(company_match.group(1)))
+        elif site_match and has_website(int(site_match.group(1))):
+            if site_match.group(2).endswith(".pdf"):
+                content_type, body = "application/pdf", "%PDF-1.4 mock"
+            else:
+                body = render_site_page(int(site_match.group(1)), site_match.group(2))
+        else:
+            status, body = 404, "<html><body><h1>Page not found</h1></body></html>"
+
+        if url.path != "/__stats":
+            with self.pages_served.get_lock():
+                self.pages_served.value += 1
+        encoded = body.encode("utf-8")
+        etag = '"' + hashlib.sha1(encoded).hexdigest() + '"' # Lets the scrapers' response cache revalidate
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output readable
+
+
+def _serve(port_value, pages_served, company_count, ready):
+    MockRequestHandler.pages_served = pages_served
+    MockRequestHandler.company_count = company_count
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockRequestHandler)
+    server.daemon_threads = True
+    port_value.value = server.server_address[1]
+    ready.set()
+    server.serve_forever()
+
+
+def start_mock_server(company_count=MOCK_COMPANY_COUNT):
+    """Starts the mock Companies House + company websites server in a separate process
+       (so it doesn't share CPU time or memory with the scraper being measured).
+       Returns (process, base_url); stop it with process.terminate()."""
+    port_value = multiprocessing.Value("i", 0)
+    pages_served = multiprocessing.Value("l", 0)
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=_serve, args=(port_value, pages_served, company_count, ready), daemon=True)
+    process.start()
+    ready.wait(10)
+    return process, f"http://127.0.0.1:{port_value.value}"
+
+
+if __name__ == "__main__":
+    mock_process, mock_base_url = start_mock_server()
+    print(f"Mock Companies House and company websites serving at {mock_base_url} (Ctrl-C to stop)")
+    print(f"Search: {mock_base_url}/advanced-search/get-results?sicCodes=28150")
+    try:
+        mock_process.join()
+    except KeyboardInterrupt:
+        mock_process.terminate()
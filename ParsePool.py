@@ -0,0 +1,70 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# One core is left for the main thread and the network threads; on a single-core machine parsing stays inline.
+DEFAULT_PARSE_WORKERS = max(0, (os.cpu_count() or 1) - 1)
+
+
+def default_parse_workers(submitting_threads):
+    """DEFAULT_PARSE_WORKERS, capped at the number of threads that submit parses: each of them waits
+       for its own parse, so no more than that many can ever run at once and extra processes would idle."""
+    return min(DEFAULT_PARSE_WORKERS, max(1, submitting_threads))
+
+
+def _timed_call(function, args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+class ParsePool:
+    """Runs CPU-bound parse functions in worker processes, away from the threads doing network I/O,
+       so parsing is not serialised by the GIL. With workers=0 every call runs inline on the calling
+       thread instead. Functions and arguments must be picklable (module-level functions, bytes/str).
+
+       submit() returns a Future of (result, parse_seconds); the timing is measured in the worker, so
+       callers can record it in their own metrics."""
+
+    def __init__(self, workers=DEFAULT_PARSE_WORKERS):
+        self.workers = max(0, workers)
+        self._executor = None
+        if self.workers:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._executor.submit(int).result() # Start the worker processes now, before any fetch threads exist
+
+    def submit(self, function, *args):
+        if self._executor is not None:
+            return self._executor.submit(_timed_call, function, args)
+        future = Future()
+        try:
+            future.set_result(_timed_call(function, args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def map_in_order(executor, function, jobs, max_in_flight):
+    """Like executor.map, but only keeps max_in_flight jobs submitted at once, so the jobs iterable
+       is consumed lazily and memory does not grow with the input. Yields (job, result) in job order."""
+    in_flight = deque()
+    for job in jobs:
+        in_flight.append((job, executor.submit(function, job)))
+        if len(in_flight) >= max_in_flight:
+            queued_job, future = in_flight.popleft()
+            yield queued_job, future.result()
+    while in_flight:
+        queued_job, future = in_flight.popleft()
+        yield queued_job, future.result()
@@ -0,0 +1,108 @@
+import threading
+import time
+
+THROTTLE_STATUS_CODES = (429, 503) # Responses that mean "slow down"
+BACKOFF_FACTOR = 0.5 # Rate multiplier applied each time a host pushes back
+SPEEDUP_FACTOR = 1.25 # Rate multiplier applied after a run of healthy responses
+SUCCESSES_BEFORE_SPEEDUP = 10 # Consecutive healthy responses needed before speeding up again
+
+
+def retry_after_seconds(headers):
+    """The Retry-After header in seconds, or None if it is missing or given as an HTTP date."""
+    value = (headers or {}).get('Retry-After', '')
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class _HostState:
+    __slots__ = ("rate", "next_free", "blocked_until", "healthy_streak")
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.next_free = 0.0 # Monotonic time at which the bucket is next empty (GCRA "theoretical arrival time")
+        self.blocked_until = 0.0 # End of the current cool-down, if any
+        self.healthy_streak = 0
+
+
+class HostRateLimiter:
+    """Adaptive token bucket per host, shared by every worker thread.
+
+    Each host starts at requests_per_second with room for `burst` back-to-back requests. When a host
+    answers 429/503 or serves a CAPTCHA its rate is halved (down to min_requests_per_second) and it
+    gets a cool-down, honouring Retry-After when given. After SUCCESSES_BEFORE_SPEEDUP healthy
+    responses in a row the rate creeps back up, never past max_requests_per_second."""
+
+    def __init__(self, requests_per_second, max_requests_per_second=None, min_requests_per_second=None, burst=1):
+        self.initial_rate = requests_per_second
+        self.max_rate = max(requests_per_second, max_requests_per_second or requests_per_second)
+        self.min_rate = min(requests_per_second, min_requests_per_second or requests_per_second / 16)
+        self.burst = max(1, burst)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_rate)
+        return state
+
+    def acquire(self, host, cancelled=None):
+        """Blocks until a request to host is allowed and returns the seconds spent waiting.
+           The slot is reserved under the lock, so concurrent callers queue up fairly.
+
+           With a threading.Event `cancelled`, nothing is reserved while waiting: the caller takes a
+           slot only once one is free, and returns None as soon as cancelled is set, so a request that
+           turns out not to be needed costs the host's budget nothing and frees its thread at once."""
+        if cancelled is not None:
+            return self._acquire_cancellable(host, cancelled)
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            interval = 1.0 / state.rate
+            next_free = max(now, state.next_free)
+            start_at = max(next_free - (self.burst - 1) * interval, state.blocked_until)
+            state.next_free = next_free + interval
+        wait_seconds = start_at - now
+        if wait_seconds <= 0:
+            return 0.0
+        time.sleep(wait_seconds)
+        return wait_seconds
+
+    def _acquire_cancellable(self, host, cancelled):
+        started = time.monotonic()
+        while not cancelled.is_set():
+            with self._lock:
+                state = self._state(host)
+                now = time.monotonic()
+                interval = 1.0 / state.rate
+                next_free = max(now, state.next_free)
+                start_at = max(next_free - (self.burst - 1) * interval, state.blocked_until)
+                if start_at <= now:
+                    state.next_free = next_free + interval
+                    return now - started
+            cancelled.wait(start_at - now)
+        return None
+
+    def report_success(self, host):
+        with self._lock:
+            state = self._state(host)
+            state.healthy_streak += 1
+            if state.healthy_streak >= SUCCESSES_BEFORE_SPEEDUP and state.rate < self.max_rate:
+                state.rate = min(self.max_rate, state.rate * SPEEDUP_FACTOR)
+                state.healthy_streak = 0
+
+    def report_throttled(self, host, retry_after=None):
+        """Slows host down after a 429/503/CAPTCHA. No request is let through before the cool-down ends."""
+        with self._lock:
+            state = self._state(host)
+            state.rate = max(self.min_rate, state.rate * BACKOFF_FACTOR)
+            state.healthy_streak = 0
+            cool_down = retry_after if retry_after is not None else 1.0 / state.rate
+            state.blocked_until = max(state.blocked_until, time.monotonic() + cool_down)
+            state.next_free = max(state.next_free, state.blocked_until)
+
+    def current_rate(self, host):
+        with self._lock:
+            return self._state(host).rate
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urldefrag
+
+
+class OfflineCacheMiss(requests.exceptions.RequestException):
+    """Raised in offline mode for a URL that was never cached; handled like any other failed request."""
+
+
+class ResponseCache:
+    """On-disk HTTP response cache shared by both scrapers.
+
+    Bodies are stored once per SHA-256 of their content under `directory/bodies/`, and an SQLite index
+    maps each requested URL to its body, final URL (after redirects), content type, encoding and
+    ETag/Last-Modified validators. Online, a cached URL is revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 instead of a full download. With offline=True
+    nothing goes over the network: responses are replayed from the cache and misses raise OfflineCacheMiss.
+
+    get() returns a regular requests.Response with an extra `cache_status` attribute:
+    "miss" (fetched and stored), "revalidated" (304, body from cache), "offline" (replayed) or
+    "uncached" (a non-200 answer, passed through and not stored). Safe to share between worker threads."""
+
+    def __init__(self, directory, offline=False):
+        self.directory = directory
+        self.offline = offline
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.join(self.directory, 'bodies'), exist_ok=True)
+            self._connection = sqlite3.connect(os.path.join(self.directory, 'index.sqlite3'), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " final_url TEXT NOT NULL,"
+                " content_type TEXT,"
+                " encoding TEXT,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " body_sha256 TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _body_path(self, body_sha256):
+        return os.path.join(self.directory, 'bodies', body_sha256[:2], body_sha256)
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT final_url, content_type, encoding, etag, last_modified, body_sha256 FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._body_path(row[5])):
+            return None
+        return row
+
+    def _store(self, url, response):
+        content = response.content
+        body_sha256 = hashlib.sha256(content).hexdigest()
+        body_path = self._body_path(body_sha256)
+        if not os.path.exists(body_path): # Content-addressed: identical bodies are stored once
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            temporary_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, 'wb') as body_file:
+                body_file.write(content)
+            os.replace(temporary_path, body_path)
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (url, final_url, content_type, encoding, etag, last_modified, body_sha256, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.url, response.headers.get('Content-Type'), response.encoding,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), body_sha256, time.time()),
+            )
+            connection.commit()
+
+    def _replay(self, url, row, cache_status):
+        final_url, content_type, encoding, etag, last_modified, body_sha256 = row
+        with open(self._body_path(body_sha256), 'rb') as body_file:
+            content = body_file.read()
+        response = requests.models.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = final_url
+        response.encoding = encoding
+        response.headers = CaseInsensitiveDict({key: value for key, value in
+                                                (('Content-Type', content_type), ('ETag', etag), ('Last-Modified', last_modified)) if value})
+        response._content = content
+        response.cache_status = cache_status
+        return response
+
+    def get(self, session, url, headers=None, **kwargs):
+        """session.get(url, headers=headers, **kwargs) through the cache."""
+        url = urldefrag(url)[0]
+        cached = self._lookup(url)
+        if self.offline:
+            if cached is None:
+                raise OfflineCacheMiss(f"{url} is not in the response cache ({self.directory})")
+            return self._replay(url, cached, "offline")
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            etag, last_modified = cached[3], cached[4]
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+        response = session.get(url, headers=request_headers, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            with self._lock:
+                self._connect().execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                self._connection.commit()
+            return self._replay(url, cached, "revalidated")
+        if response.status_code == 200:
+            self._store(url, response)
+            response.cache_status = "miss"
+        else:
+            response.cache_status = "uncached"
+        return response
+
+    def discard(self, url):
+        """Forgets url, e.g. after a 200 response turned out to be a CAPTCHA page."""
+        with self._lock:
+            self._connect().execute("DELETE FROM responses WHERE url = ?", (urldefrag(url)[0],))
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,114 @@
+import csv
+import os
+
+# --- Configuration ---
+PARQUET_ROW_GROUP_SIZE = 10000 # Rows buffered before they are written out as one Parquet row group
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+
+def is_parquet_path(path):
+    return path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def import_pyarrow():
+    """pyarrow is optional, and imported only when Parquet is used: it adds ~40 MB to the process."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet output needs the pyarrow package (pip install pyarrow).") from None
+    return pyarrow
+
+
+class CsvResultWriter:
+    """Writes rows to a CSV file, flushing after each one so an interrupted run keeps every finished row.
+       With append=True rows are added to an existing file and the header is only written if it is empty."""
+
+    def __init__(self, path, columns, append=False):
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file, lineterminator='\n') # Same line endings as pandas' to_csv
+        if write_header:
+            self._writer.writerow(columns)
+            self._file.flush()
+
+    def write_row(self, values):
+        self._writer.writerow(values)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetResultWriter:
+    """Writes rows to a Parquet file of string columns, PARQUET_ROW_GROUP_SIZE rows per row group.
+
+    Pending rows are buffered column by column (one list slot per value, no per-row objects). The file
+    is built next to `path` and moved into place by close(), which also runs when a run is interrupted
+    with Ctrl+C; a killed process loses the rows of that run. Parquet files cannot be appended to, so
+    with append=True the rows of the existing file are copied into the new one first."""
+
+    def __init__(self, path, columns, append=False):
+        pyarrow = self._pyarrow = import_pyarrow()
+        self.path = path
+        self.columns = list(columns)
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for column in self.columns])
+        self._buffers = [[] for _ in self.columns]
+        self._building_path = path + '.building'
+        self._writer = pyarrow.parquet.ParquetWriter(self._building_path, self._schema, compression=PARQUET_COMPRESSION)
+        if append and os.path.exists(path):
+            for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=PARQUET_ROW_GROUP_SIZE, columns=self.columns):
+                self._writer.write_table(pyarrow.Table.from_batches([batch]).cast(self._schema))
+
+    def write_row(self, values):
+        for buffer, value in zip(self._buffers, values):
+            buffer.append(value)
+        if len(self._buffers[0]) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._buffers[0]:
+            pyarrow = self._pyarrow
+            arrays = [pyarrow.array(buffer, type=pyarrow.string()) for buffer in self._buffers]
+            self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+            self._buffers = [[] for _ in self.columns]
+
+    def close(self):
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+            os.replace(self._building_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_result_writer(path, columns, append=False):
+    """A ParquetResultWriter for *.parquet / *.pq paths, else a CsvResultWriter."""
+    if is_parquet_path(path):
+        return ParquetResultWriter(path, columns, append)
+    return CsvResultWriter(path, columns, append)
+
+
+def iter_column_values(path, column, batch_size=PARQUET_ROW_GROUP_SIZE):
+    """Yields the values of one column of an output file as strings, without loading the whole file."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    if is_parquet_path(path):
+        for batch in import_pyarrow().parquet.ParquetFile(path).iter_batches(batch_size=batch_size, columns=[column]):
+            yield from (value or "" for value in batch.column(0).to_pylist())
+        return
+    with open(path, newline='', encoding='utf-8') as result_file:
+        for row in csv.DictReader(result_file):
+            yield row.get(column) or ""
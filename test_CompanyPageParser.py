@@ -0,0 +1,32 @@
+import pytest
+
+import CompanyPageParser
+import MockServer
+from CompanyPageParser import COMPANY_PAGE_FIXTURES, SEARCH_PAGE_FIXTURES, parse_company_page, parse_search_page
+
+BACKENDS = (["htmlparser"] + (["lxml"] if CompanyPageParser.lxml is not None else [])
+            + (["selectolax"] if CompanyPageParser.SelectolaxHTMLParser is not None else []))
+COMPANY_PAGES = COMPANY_PAGE_FIXTURES + [MockServer.render_company_page(index) for index in range(1, 7)]
+SEARCH_PAGES = SEARCH_PAGE_FIXTURES + [MockServer.render_search_page(page, 45) for page in range(1, 5)]
+
+
+def test_default_backend_is_available():
+    assert CompanyPageParser.COMPANY_PAGE_PARSER_BACKEND in BACKENDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", COMPANY_PAGES, ids=[f"company-{index}" for index in range(len(COMPANY_PAGES))])
+def test_company_page_matches_legacy(backend, page):
+    assert parse_company_page(page, backend) == CompanyPageParser._legacy_parse_company_page(page)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", SEARCH_PAGES, ids=[f"search-{index}" for index in range(len(SEARCH_PAGES))])
+def test_search_page_matches_legacy(backend, page):
+    assert parse_search_page(page, backend) == CompanyPageParser._legacy_parse_search_page(page)
+
+
+def test_default_backend_parses_mock_company_page():
+    details = parse_company_page(MockServer.render_company_page(1))
+    assert details.location != "Not found"
+    assert details.sic_description != "Not found"
@@ -0,0 +1,30 @@
+import pytest
+
+import EmailExtractor
+from EmailExtractor import LINK_CORPUS_PAGE, REGRESSION_CORPUS, extract_emails_from_html, scan_page
+
+BACKENDS = ["htmlparser"] + (["lxml"] if EmailExtractor.lxml is not None else [])
+CORPUS_IDS = [markup if len(markup) <= 60 else f"{markup[:30]}...{markup[-30:]} ({len(markup)} chars)" for markup, _, _ in REGRESSION_CORPUS]
+
+
+def corpus_page(markup):
+    return f"<html><body>{markup}</body></html>".encode('utf-8')
+
+
+@pytest.mark.parametrize("markup, expected_text, expected_mailto", REGRESSION_CORPUS, ids=CORPUS_IDS)
+def test_legacy_extractor_matches_corpus(markup, expected_text, expected_mailto):
+    assert sorted(EmailExtractor._legacy_extract_emails(corpus_page(markup))) == sorted(expected_text)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("markup, expected_text, expected_mailto", REGRESSION_CORPUS, ids=CORPUS_IDS)
+def test_extractor_matches_corpus(backend, markup, expected_text, expected_mailto):
+    assert sorted(extract_emails_from_html(corpus_page(markup), backend)) == sorted(expected_text + expected_mailto)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_scanner_links_match_legacy(backend):
+    page_url = "https://acme.co.uk/index.html"
+    expected_links = EmailExtractor._legacy_extract_links(LINK_CORPUS_PAGE, page_url, "acme.co.uk", {page_url})
+    links = [url for url, anchor_text in scan_page(LINK_CORPUS_PAGE, page_url, "acme.co.uk", 100, {page_url}, backend).links]
+    assert links == expected_links